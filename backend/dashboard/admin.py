@@ -1,38 +1,76 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from django.utils.html import format_html
-from django.db import models
+from django.utils.safestring import mark_safe
+from django.db import connection, models
+from django.db.models import Count, OuterRef, Subquery
 from .models import SystemGroup, PowerRecord
 
+# 固定內容的 HTML 片段，於模組載入時建立一次，changelist 每列直接回傳
+_NO_DATA_HTML = mark_safe('<span style="color: gray;">無數據</span>')
+
+# 資料表筆數超過此值時，未過濾的列表改用資料庫統計資訊估計總筆數
+ESTIMATED_COUNT_THRESHOLD = 100000
+
+def estimated_row_count(model):
+    """讀取資料庫維護的資料表筆數估計值（MySQL / PostgreSQL），不支援時回傳 None"""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", [table]
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+class EstimatedCountPaginator(Paginator):
+    """未套用任何過濾條件的大資料表以估計值分頁，避免每次開列表頁都 COUNT(*) 全表掃描"""
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model)
+            if estimate is not None and estimate > ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
 @admin.register(SystemGroup)
 class SystemGroupAdmin(admin.ModelAdmin):
     list_display = ['name', 'system_type', 'location', 'created_at', 'latest_power', 'record_count']
     list_filter = ['system_type', 'location']
     search_fields = ['name', 'location']
     
+    def get_queryset(self, request):
+        """以單一查詢標註最新功率與記錄數量，避免每列各查一次 (N+1)"""
+        latest_power = PowerRecord.objects.filter(
+            system=OuterRef('pk')
+        ).order_by('-timestamp').values('power_output')[:1]
+        return super().get_queryset(request).annotate(
+            _record_count=Count('powerrecord'),
+            _latest_power=Subquery(latest_power),
+        )
+    
     def latest_power(self, obj):
         """顯示最新功率"""
-        try:
-            latest = PowerRecord.objects.filter(system=obj).first()
-            if latest and latest.power_output is not None:
-                power_value = float(latest.power_output)
-                return format_html(
-                    '<span style="color: green; font-weight: bold;">{:.2f} W</span>',
-                    power_value
-                )
-            else:
-                return format_html('<span style="color: gray;">無數據</span>')
-        except Exception as e:
-            return format_html('<span style="color: red;">錯誤</span>')
+        if obj._latest_power is None:
+            return _NO_DATA_HTML
+        return format_html(
+            '<span style="color: green; font-weight: bold;">{} W</span>',
+            f'{obj._latest_power:.2f}'
+        )
     
     latest_power.short_description = "最新功率"
     
     def record_count(self, obj):
         """顯示記錄數量"""
-        try:
-            count = PowerRecord.objects.filter(system=obj).count()
-            return f"{count} 筆"
-        except Exception:
-            return "0 筆"
+        return f"{obj._record_count} 筆"
     
     record_count.short_description = "記錄數量"
 
@@ -89,7 +127,16 @@ class PowerRecordAdmin(admin.ModelAdmin):
     )
     
     list_per_page = 50
+    list_select_related = ('system',)
+    # 過濾後不再另外對全表 COUNT(*) 顯示「共 N 筆」
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     def get_queryset(self, request):
-        """優化查詢性能"""
-        return super().get_queryset(request).select_related('system')
\ No newline at end of file
+        """列表頁只載入 list_display 用到的欄位，其餘十多個較少讀取的可選欄位不取出"""
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith('_changelist'):
+            # system 欄位顯示 SystemGroup.__str__()，需要 name 與 system_type
+            queryset = queryset.only(*self.list_display, 'system__name', 'system__system_type')
+        return queryset
\ No newline at end of file
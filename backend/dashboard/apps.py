@@ -3,4 +3,7 @@ from django.apps import AppConfig
 class DashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'dashboard'
-    verbose_name = '太陽能追日系統'
\ No newline at end of file
+    verbose_name = '太陽能追日系統'
+    
+    def ready(self):
+        from . import signals  # noqa: F401  註冊快取失效 signal
\ No newline at end of file
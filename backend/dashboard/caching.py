@@ -0,0 +1,51 @@
+"""
+caching.py  -  API 回應快取的 key 與失效處理
+
+使用 Django cache framework（settings.CACHES）：設定 REDIS_URL 時為 Redis，
+否則為單一行程的記憶體快取。失效由 signals.py 與批次寫入路徑觸發。
+"""
+import time
+from functools import lru_cache
+
+from django.core.cache import cache
+
+from .models import SystemGroup
+
+SYSTEMS_CACHE_TIMEOUT = 60      # 系統清單（設定類資料，很少變動）
+LATEST_CACHE_TIMEOUT = 60       # 各系統最新一筆記錄
+SYSTEM_EXISTS_TTL = 60          # 上傳時的系統 ID 檢查（行程內 LRU）
+
+_SYSTEMS_VERSION_KEY = 'dashboard:systems:version'
+
+
+def systems_list_key(full_path):
+    """系統清單快取 key；SystemGroup 變更時遞增版本號，舊 key 自然失效"""
+    version = cache.get_or_set(_SYSTEMS_VERSION_KEY, 1, None)
+    return f'dashboard:systems:{version}:{full_path}'
+
+
+@lru_cache(maxsize=256)
+def _system_exists(system_id, bucket):
+    return SystemGroup.objects.filter(id=system_id).exists()
+
+
+def system_exists(system_id):
+    """系統 ID 是否存在；以時間分桶作為 TTL，同一桶內不重複查詢"""
+    return _system_exists(system_id, int(time.monotonic() // SYSTEM_EXISTS_TTL))
+
+
+def invalidate_systems():
+    _system_exists.cache_clear()
+    try:
+        cache.incr(_SYSTEMS_VERSION_KEY)
+    except ValueError:
+        cache.set(_SYSTEMS_VERSION_KEY, 1, None)
+
+
+def latest_key(system_id=None):
+    """最新記錄快取 key；system_id 為 None 表示不分系統的最新一筆"""
+    return f'dashboard:latest:{system_id if system_id is not None else "all"}'
+
+
+def invalidate_latest(*system_ids):
+    cache.delete_many([latest_key(None)] + [latest_key(i) for i in system_ids])
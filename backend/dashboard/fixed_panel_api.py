@@ -3,6 +3,7 @@ fixed_panel_api.py  -  固定式面板歷史數據 API（pandas in-memory cache
 """
 import os
 import threading
+from datetime import datetime
 import pandas as pd
 from django.http import JsonResponse, FileResponse
 from django.views import View
@@ -360,7 +361,6 @@ class FixedPanelReloadView(View):
 
 
 def _now_str():
-    from datetime import datetime
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
 
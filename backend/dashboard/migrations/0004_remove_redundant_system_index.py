@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-15 09:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0003_powerrecord_actuator_total_current_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='powerrecord',
+            name='idx_system',
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.6 on 2026-10-15 09:44
+
+"""資料遷移：刪除重複的 PowerRecord（為 0006 的 (system, timestamp) 唯一約束做準備）
+
+⚠️ 此遷移會刪除資料：同一系統、同一時間戳有多筆記錄時，只保留 id 最大（最後寫入）的一筆，
+其餘刪除。執行時會列出受影響的 (system, timestamp) 與刪除筆數。
+若需保留這些資料，請在 migrate 前先備份 dashboard_powerrecord 資料表，或自行整併重複記錄。
+此操作無法反向還原。
+"""
+
+from django.db import migrations
+from django.db.models import Count, Max
+
+# 逐筆列出的重複組數上限，其餘只計入總數
+REPORT_LIMIT = 20
+
+
+def remove_duplicate_records(apps, schema_editor):
+    """同一 (system, timestamp) 只保留 id 最大的一筆，並輸出刪除統計"""
+    PowerRecord = apps.get_model('dashboard', 'PowerRecord')
+    duplicates = (
+        PowerRecord.objects.values('system_id', 'timestamp')
+        .annotate(n=Count('id'), keep_id=Max('id'))
+        .filter(n__gt=1)
+        .order_by('system_id', 'timestamp')
+    )
+    groups = 0
+    deleted_total = 0
+    for dup in duplicates.iterator():
+        deleted, _ = PowerRecord.objects.filter(
+            system_id=dup['system_id'], timestamp=dup['timestamp']
+        ).exclude(id=dup['keep_id']).delete()
+        groups += 1
+        deleted_total += deleted
+        if groups <= REPORT_LIMIT:
+            print(f"\n  刪除重複記錄: system={dup['system_id']} timestamp={dup['timestamp']} "
+                  f"刪除 {deleted} 筆，保留 id={dup['keep_id']}")
+    
+    if groups:
+        if groups > REPORT_LIMIT:
+            print(f"\n  ...另有 {groups - REPORT_LIMIT} 組重複未逐筆列出")
+        print(f"\n  共 {groups} 組重複 (system, timestamp)，刪除 {deleted_total} 筆 PowerRecord")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0004_remove_redundant_system_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_records, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.6 on 2026-10-15 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0005_remove_duplicate_power_records'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='powerrecord',
+            constraint=models.UniqueConstraint(fields=('system', 'timestamp'), name='uniq_system_timestamp'),
+        ),
+    ]
@@ -88,28 +88,38 @@ class PowerRecord(models.Model):
         verbose_name_plural = "發電記錄"
         ordering = ['-timestamp']
         indexes = [
+            # date_hierarchy / 全表依時間排序
             models.Index(fields=['-timestamp'], name='idx_timestamp'),
-            models.Index(fields=['system'], name='idx_system'),
+            # 依系統過濾與「各系統最新一筆」查詢；system 單欄查詢可直接使用此複合索引的前綴
             models.Index(fields=['system', '-timestamp'], name='idx_system_timestamp'),
         ]
+        constraints = [
+            # 同一系統同一時間點只保留一筆；樹莓派重送時由資料庫 upsert 去重
+            models.UniqueConstraint(fields=['system', 'timestamp'], name='uniq_system_timestamp'),
+        ]
+    
+    # 可由電壓 × 電流自動補上的功率欄位：(功率, 電壓, 電流)
+    DERIVED_POWER_FIELDS = (
+        ('power_output', 'voltage', 'current'),
+        ('raspberry_pi_power', 'raspberry_pi_voltage', 'raspberry_pi_current'),
+        ('actuator_total_power', 'actuator_total_voltage', 'actuator_total_current'),
+        ('actuator_power', 'actuator_voltage', 'actuator_current'),  # [向下相容] 舊版推桿
+    )
+    
+    @classmethod
+    def fill_derived(cls, data):
+        """補上未提供的功率欄位 (P = V × I)，直接修改並回傳 data dict
+        
+        供 bulk_create 等不經過 save() 的批次寫入路徑事先計算衍生欄位。
+        """
+        for power, voltage, current in cls.DERIVED_POWER_FIELDS:
+            if not data.get(power) and data.get(voltage) and data.get(current):
+                data[power] = data[voltage] * data[current]
+        return data
     
     def save(self, *args, **kwargs):
         # 自動計算功率（如果沒有提供）
-        if not self.power_output and self.voltage and self.current:
-            self.power_output = self.voltage * self.current
-        
-        # 自動計算樹莓派功率
-        if not self.raspberry_pi_power and self.raspberry_pi_voltage and self.raspberry_pi_current:
-            self.raspberry_pi_power = self.raspberry_pi_voltage * self.raspberry_pi_current
-        
-        # 自動計算推桿總功率
-        if not self.actuator_total_power and self.actuator_total_voltage and self.actuator_total_current:
-            self.actuator_total_power = self.actuator_total_voltage * self.actuator_total_current
-        
-        # [向下相容] 自動計算舊版推桿功率
-        if not self.actuator_power and self.actuator_voltage and self.actuator_current:
-            self.actuator_power = self.actuator_voltage * self.actuator_current
-            
+        self.fill_derived(self.__dict__)
         super().save(*args, **kwargs)
     
     def __str__(self):
@@ -0,0 +1,29 @@
+"""
+renderers.py  -  DRF JSON renderer（orjson 加速）
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# orjson 是選用依賴：未安裝時退回 DRF 內建 JSONRenderer（標準庫 json）
+try:
+    import orjson
+    _ORJSON_OK = True
+except ImportError:
+    orjson = None
+    _ORJSON_OK = False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """以 orjson 輸出 JSON；orjson 不認得的型別（lazy 翻譯字串、Decimal…）交給 DRF encoder"""
+    _default = staticmethod(JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not _ORJSON_OK:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return orjson.dumps(
+            data,
+            default=self._default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC,
+        )
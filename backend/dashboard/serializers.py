@@ -1,12 +1,30 @@
+from datetime import datetime
+
+from django.utils import timezone
 from rest_framework import serializers
 from .models import SystemGroup, PowerRecord
 
+# msgspec 是選用依賴：有安裝時實時數據以 C 層解碼＋驗證的快速路徑處理，
+# 未安裝時 RealTimeDataViewSet 自動退回 DRF RealTimeDataSerializer
+try:
+    import msgspec
+    _MSGSPEC_OK = True
+except ImportError:
+    msgspec = None
+    _MSGSPEC_OK = False
+
+# 系統類型顯示名稱對照表（只有兩種，於模組載入時建立一次）
+_SYSTEM_TYPE_MAP = dict(SystemGroup.SYSTEM_TYPES)
+
 class SystemGroupSerializer(serializers.ModelSerializer):
-    system_type_display = serializers.CharField(source='get_system_type_display', read_only=True)
+    system_type_display = serializers.SerializerMethodField()
     
     class Meta:
         model = SystemGroup
         fields = '__all__'
+    
+    def get_system_type_display(self, obj):
+        return _SYSTEM_TYPE_MAP.get(obj.system_type, obj.system_type)
 
 class PowerRecordSerializer(serializers.ModelSerializer):
     system_name = serializers.CharField(source='system.name', read_only=True)
@@ -16,9 +34,34 @@ class PowerRecordSerializer(serializers.ModelSerializer):
         model = PowerRecord
         fields = '__all__'  # Include all fields including new dual actuator fields
 
+class PowerRecordListSerializer(serializers.ModelSerializer):
+    """列表端點專用：只包含前端表格用到的欄位"""
+    system_name = serializers.CharField(source='system.name', read_only=True)
+    
+    class Meta:
+        model = PowerRecord
+        fields = ('id', 'system', 'system_name', 'timestamp', 'voltage', 'current', 'power_output',
+                  'light_intensity', 'temperature', 'ns_actuator_angle', 'ew_actuator_angle')
+
+class PowerRecordLatestSerializer(serializers.ModelSerializer):
+    """latest 端點專用：儀表板即時卡片用到的欄位，不含舊版單推桿欄位"""
+    system_name = serializers.CharField(source='system.name', read_only=True)
+    system_type = serializers.CharField(source='system.system_type', read_only=True)
+    
+    class Meta:
+        model = PowerRecord
+        fields = ('id', 'system', 'system_name', 'system_type', 'timestamp',
+                  'voltage', 'current', 'power_output',
+                  'light_intensity', 'temperature', 'humidity', 'panel_azimuth', 'panel_tilt',
+                  'raspberry_pi_voltage', 'raspberry_pi_current', 'raspberry_pi_power',
+                  'actuator_total_voltage', 'actuator_total_current', 'actuator_total_power',
+                  'ns_actuator_angle', 'ns_actuator_extension',
+                  'ew_actuator_angle', 'ew_actuator_extension', 'notes')
+
 class RealTimeDataSerializer(serializers.Serializer):
     """接收樹莓派實時數據的專用序列化器"""
     system_id = serializers.IntegerField()
+    timestamp = serializers.DateTimeField(required=False)  # 未提供時由伺服器填入當下時間
     
     # 基本電力數據
     voltage = serializers.FloatField()
@@ -61,4 +104,74 @@ class RealTimeDataSerializer(serializers.Serializer):
     
     # 其他數據
     device_id = serializers.CharField(required=False)
-    notes = serializers.CharField(required=False, allow_blank=True)
\ No newline at end of file
+    notes = serializers.CharField(required=False, allow_blank=True)
+    
+    def validate(self, attrs):
+        # 驗證時即補上衍生功率欄位 (P = V × I)，寫入路徑不需再各自計算
+        return PowerRecord.fill_derived(attrs)
+
+if _MSGSPEC_OK:
+    class RealTimePayload(msgspec.Struct, kw_only=True):
+        """RealTimeDataSerializer 的 msgspec 版本，欄位與預設值需保持一致"""
+        system_id: int
+        timestamp: datetime | None = None
+        
+        # 基本電力數據
+        voltage: float
+        current: float
+        power_output: float | None = None
+        
+        # 可選的環境數據
+        light_intensity: float | None = None
+        temperature: float | None = None
+        humidity: float | None = None
+        
+        # 系統狀態
+        panel_azimuth: float | None = None
+        panel_tilt: float | None = None
+        
+        # 樹莓派電源
+        raspberry_pi_voltage: float | None = None
+        raspberry_pi_current: float | None = None
+        raspberry_pi_power: float | None = None
+        
+        # 南北推桿
+        ns_actuator_angle: float | None = None
+        ns_actuator_extension: float | None = None
+        
+        # 東西推桿
+        ew_actuator_angle: float | None = None
+        ew_actuator_extension: float | None = None
+        
+        # 推桿總功率
+        actuator_total_voltage: float | None = None
+        actuator_total_current: float | None = None
+        actuator_total_power: float | None = None
+        
+        # 舊版推桿相關數據（保留向下相容）
+        actuator_voltage: float | None = None
+        actuator_current: float | None = None
+        actuator_power: float | None = None
+        actuator_angle: float | None = None
+        actuator_extension: float | None = None
+        
+        # 其他數據
+        device_id: str | None = None
+        notes: str = ''
+    
+    # 單筆 dict 或補傳時的多筆 list
+    _realtime_decoder = msgspec.json.Decoder(RealTimePayload | list[RealTimePayload], strict=False)
+    
+    def decode_realtime_payload(body):
+        """解碼並驗證實時數據 JSON，回傳 (rows, many)；格式錯誤時拋出 msgspec.DecodeError/ValidationError"""
+        decoded = _realtime_decoder.decode(body)
+        many = isinstance(decoded, list)
+        rows = [msgspec.structs.asdict(item) for item in (decoded if many else [decoded])]
+        for row in rows:
+            # 與 DRF DateTimeField 相同：未帶時區的時間視為 settings.TIME_ZONE
+            ts = row['timestamp']
+            if ts is not None and timezone.is_naive(ts):
+                row['timestamp'] = timezone.make_aware(ts)
+            # 與 RealTimeDataSerializer.validate 相同：補上衍生功率欄位
+            PowerRecord.fill_derived(row)
+        return rows, many
@@ -0,0 +1,20 @@
+"""
+signals.py  -  資料變更時讓 API 快取失效（見 caching.py）
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import invalidate_latest, invalidate_systems
+from .models import PowerRecord, SystemGroup
+
+
+@receiver([post_save, post_delete], sender=SystemGroup)
+def systems_changed(sender, **kwargs):
+    invalidate_systems()
+
+
+# 刻意不接 PowerRecord 的 post_delete：有 receiver 時 Django 會放棄 fast delete，
+# 刪除系統時得逐筆載入其所有記錄；刪除記錄後的最新值最多延遲 LATEST_CACHE_TIMEOUT 秒
+@receiver(post_save, sender=PowerRecord)
+def power_record_saved(sender, instance, **kwargs):
+    invalidate_latest(instance.system_id)
@@ -1,20 +1,139 @@
+import csv
+from datetime import datetime, time, timedelta
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from rest_framework.pagination import CursorPagination
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django.db import models
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import http_date, quote_etag
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, connection, models, transaction
+from django.db.models import F
 from .models import SystemGroup, PowerRecord
+from .caching import (
+    LATEST_CACHE_TIMEOUT,
+    SYSTEMS_CACHE_TIMEOUT,
+    invalidate_latest,
+    latest_key,
+    system_exists,
+    systems_list_key,
+)
 from .serializers import (
     SystemGroupSerializer, 
     PowerRecordSerializer, 
-    RealTimeDataSerializer
+    PowerRecordListSerializer,
+    PowerRecordLatestSerializer,
+    RealTimeDataSerializer,
+    _MSGSPEC_OK,
 )
+if _MSGSPEC_OK:
+    import msgspec
+    from .serializers import decode_realtime_payload
+
+
+def latest_response(request, data):
+    """以最新記錄產生 ETag / Last-Modified：儀表板輪詢帶 If-None-Match 或 If-Modified-Since 且無新記錄時回 304
+    
+    Last-Modified 只精確到秒，同一秒內可能有多筆（10 Hz 批次上傳），
+    因此另以 id + timestamp 組成強 ETag；條件請求帶 If-None-Match 時以 ETag 為準。
+    """
+    etag = quote_etag(f"{data['id']}-{data['timestamp']}")
+    last_modified = int(parse_datetime(data['timestamp']).timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = Response(data)
+    # 304 也帶上驗證標頭，瀏覽器才會以之更新快取
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # 瀏覽器不可依 Last-Modified 推算快取時間，每次輪詢都須向伺服器確認
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
 
 class SystemGroupViewSet(viewsets.ModelViewSet):
     queryset = SystemGroup.objects.all()
     serializer_class = SystemGroupSerializer
+    
+    def list(self, request, *args, **kwargs):
+        """系統清單很少變動：快取序列化結果，SystemGroup 變更時由 signal 使快取失效"""
+        key = systems_list_key(request.get_full_path())
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, SYSTEMS_CACHE_TIMEOUT)
+        return Response(data)
+
+# latest 端點只載入序列化器用到的欄位（system 名稱與類型經由 select_related 取得）
+LATEST_FIELDS = tuple(
+    f for f in PowerRecordLatestSerializer.Meta.fields if f not in ('system_name', 'system_type')
+) + ('system__name', 'system__system_type')
+
+# 列表端點以 .values() 取出 PowerRecordListSerializer 的欄位（system_name 另以 F() 取得）
+LIST_FIELDS = tuple(f for f in PowerRecordListSerializer.Meta.fields if f != 'system_name')
+
+# CSV 匯出欄位與對應的格式，順序需與標頭一致；system_id 於輸出時換成系統名稱
+EXPORT_FIELDS = (
+    'timestamp', 'system_id', 'voltage', 'current', 'power_output',
+    'raspberry_pi_voltage', 'raspberry_pi_current', 'raspberry_pi_power',
+    'ns_actuator_angle', 'ns_actuator_extension',
+    'ew_actuator_angle', 'ew_actuator_extension',
+    'actuator_total_voltage', 'actuator_total_current', 'actuator_total_power',
+    'light_intensity', 'temperature', 'humidity', 'notes',
+)
+EXPORT_FORMAT_SPECS = (
+    '%Y-%m-%d %H:%M:%S', '', '.2f', '.3f', '.2f',
+    '.2f', '.1f', '.2f',
+    '.1f', '.0f',
+    '.1f', '.0f',
+    '.2f', '.1f', '.2f',
+    '.1f', '.1f', '.1f', '',
+)
+
+
+def _compile_export_row_formatter():
+    """依 EXPORT_FIELDS / EXPORT_FORMAT_SPECS 於載入時產生逐列格式化函式
+    
+    每欄的 None 判斷與格式字串直接展開在函式內（同 dataclasses 產生 __init__ 的做法），
+    匯出時每列只需一次函式呼叫，不必逐欄 zip 與 format()。
+    """
+    names = [f'v{i}' for i in range(len(EXPORT_FIELDS))]
+    columns = []
+    for name, field, spec in zip(names, EXPORT_FIELDS, EXPORT_FORMAT_SPECS):
+        if field == 'system_id':
+            columns.append(f"system_names.get({name}, '')")
+        elif spec:
+            columns.append(f"'' if {name} is None else f'{{{name}:{spec}}}'")
+        else:
+            columns.append(f"'' if {name} is None else {name}")
+    source = (
+        'def format_export_row(row, system_names):\n'
+        f'    {", ".join(names)}, = row\n'
+        f'    return [{", ".join(columns)}]\n'
+    )
+    namespace = {}
+    exec(compile(source, '<export_csv>', 'exec'), namespace)
+    return namespace['format_export_row']
+
+
+format_export_row = _compile_export_row_formatter()
+
+
+class Echo:
+    """供 csv.writer 使用的偽檔案：writerow 直接回傳該列字串，以便串流輸出"""
+
+    def write(self, value):
+        return value
+
+
+class PowerRecordCursorPagination(CursorPagination):
+    """以 timestamp 做 keyset (seek) 分頁：深頁數以 WHERE timestamp < ? 取代 OFFSET 掃描"""
+    page_size = 50
+    ordering = '-timestamp'
 
 class PowerRecordViewSet(viewsets.ModelViewSet):
     queryset = PowerRecord.objects.all()
@@ -33,9 +152,6 @@ class PowerRecordViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """優化查詢並處理過濾"""
-        from datetime import timedelta
-        from django.utils import timezone
-        
         queryset = PowerRecord.objects.select_related('system').all()
         
         # 手動處理system過濾，避免過濾器錯誤
@@ -54,87 +170,125 @@ class PowerRecordViewSet(viewsets.ModelViewSet):
         end_date = self.request.query_params.get('end_date', None)
         
         if start_date and end_date:
-            # 使用自訂日期範圍
+            # 使用自訂日期範圍：換算成 [start 00:00, end 隔日 00:00) 的時間區間，
+            # 避免 timestamp__date 在欄位上套 DATE() 而無法使用 (system, timestamp) 索引
             try:
+                start_day = parse_date(start_date)
+                end_day = parse_date(end_date)
+            except ValueError:
+                start_day = end_day = None  # 日期格式錯誤時忽略
+            if start_day and end_day:
                 queryset = queryset.filter(
-                    timestamp__date__gte=start_date,
-                    timestamp__date__lte=end_date
+                    timestamp__gte=timezone.make_aware(datetime.combine(start_day, time.min)),
+                    timestamp__lt=timezone.make_aware(
+                        datetime.combine(end_day + timedelta(days=1), time.min)
+                    ),
                 )
-            except Exception:
-                pass  # 日期格式錯誤時忽略
         elif days != 'all':
-            # 使用天數過濾
+            # 使用天數過濾，格式錯誤時預設 7 天
             try:
-                days_int = int(days)
-                start_time = timezone.now() - timedelta(days=days_int)
-                queryset = queryset.filter(timestamp__gte=start_time)
+                days = int(days)
             except (ValueError, TypeError):
-                # 預設使用 7 天
-                start_time = timezone.now() - timedelta(days=7)
-                queryset = queryset.filter(timestamp__gte=start_time)
+                days = 7
+            start_time = timezone.now() - timedelta(days=days)
+            queryset = queryset.filter(timestamp__gte=start_time)
         
         return queryset
     
+    @property
+    def paginator(self):
+        """帶 ?cursor= 或 ?pagination=cursor 時改用 keyset 分頁；
+        預設維持頁碼分頁（前端依 count 計算總頁數）"""
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if 'cursor' in params or params.get('pagination') == 'cursor':
+                self._paginator = PowerRecordCursorPagination()
+        return super().paginator
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return PowerRecordListSerializer
+        if self.action == 'latest':
+            return PowerRecordLatestSerializer
+        return PowerRecordSerializer
+    
+    def list(self, request, *args, **kwargs):
+        """列表查詢：以 .values() 只取需要的欄位，略過逐筆建立 model instance 與 ModelSerializer"""
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *LIST_FIELDS, system_name=F('system__name'),
+        )
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            # 分頁連結（cursor 位置）需以原始 datetime 計算，之後才轉換時間格式
+            response = self.get_paginated_response(page)
+            self._localize_timestamps(page)
+            return response
+        rows = list(queryset)
+        self._localize_timestamps(rows)
+        return Response(rows)
+    
+    def _localize_timestamps(self, rows):
+        """以序列化器的 DateTimeField 輸出 timestamp（轉為 TIME_ZONE 當地時間），與其他端點格式一致"""
+        timestamp_field = self.get_serializer().fields['timestamp']
+        for row in rows:
+            row['timestamp'] = timestamp_field.to_representation(row['timestamp'])
+    
     @action(detail=False, methods=['get'])
     def latest(self, request):
         """獲取最新記錄"""
+        system_id = request.query_params.get('system')
+        
+        # 儀表板只帶 ?system= 輪詢：此情況下回傳快取（新記錄寫入時失效）
+        cache_key = None
+        if set(request.query_params) <= {'system'}:
+            cache_key = latest_key(system_id or None)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return latest_response(request, cached)
+        
+        if system_id:
+            try:
+                int(system_id)
+            except (ValueError, TypeError):
+                return Response(
+                    {"error": "無效的系統ID"}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        
+        # get_queryset 已套用 system 過濾，不需再 filter 一次
         try:
-            system_id = request.query_params.get('system')
-            
-            if system_id:
-                try:
-                    system_id = int(system_id)
-                    latest_record = self.get_queryset().filter(system_id=system_id).first()
-                except (ValueError, TypeError):
-                    return Response(
-                        {"error": "無效的系統ID"}, 
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-            else:
-                latest_record = self.get_queryset().first()
-            
-            if latest_record:
-                serializer = self.get_serializer(latest_record)
-                return Response(serializer.data)
-            
-            return Response(
-                {"message": "沒有找到記錄"}, 
-                status=status.HTTP_404_NOT_FOUND
-            )
-            
-        except Exception as e:
+            latest_record = self.get_queryset().only(*LATEST_FIELDS).first()
+        except DatabaseError as e:
             return Response(
                 {"error": f"伺服器錯誤: {str(e)}"}, 
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        
+        if latest_record:
+            serializer = self.get_serializer(latest_record)
+            if cache_key is not None:
+                cache.set(cache_key, serializer.data, LATEST_CACHE_TIMEOUT)
+            return latest_response(request, serializer.data)
+        
+        return Response(
+            {"message": "沒有找到記錄"}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
     
     @action(detail=False, methods=['get'])
     def export_csv(self, request):
-        """匯出CSV格式的數據記錄"""
-        import csv
-        from django.http import HttpResponse
-        from datetime import datetime
+        """匯出CSV格式的數據記錄（串流輸出，不限筆數）"""
+        # get_queryset 已套用 system 過濾，不需再 filter 一次
+        queryset = self.get_queryset()
         
-        try:
-            system_id = request.query_params.get('system')
-            queryset = self.get_queryset()
-            
-            if system_id:
-                try:
-                    system_id = int(system_id)
-                    queryset = queryset.filter(system_id=system_id)
-                except (ValueError, TypeError):
-                    pass
-            
-            # 建立HTTP response with CSV content type
-            response = HttpResponse(content_type='text/csv; charset=utf-8-sig')
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            response['Content-Disposition'] = f'attachment; filename="power_records_{timestamp}.csv"'
-            
-            writer = csv.writer(response)
-            
+        writer = csv.writer(Echo())
+        
+        def rows():
+            # BOM 只寫一次，讓 Excel 正確辨識 UTF-8
+            yield '\ufeff'
             # CSV標頭
-            writer.writerow([
+            yield writer.writerow([
                 '時間戳',
                 '系統',
                 '太陽能板電壓(V)', '太陽能板電流(A)', '太陽能板功率(W)',
@@ -145,115 +299,159 @@ class PowerRecordViewSet(viewsets.ModelViewSet):
                 '光照強度(lux)', '溫度(°C)', '濕度(%)',
                 '備註'
             ])
-            
-            # 寫入數據
-            for record in queryset[:1000]:  # 限制最多1000筆
-                writer.writerow([
-                    record.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                    record.system.name if record.system else '',
-                    f"{record.voltage:.2f}" if record.voltage else '',
-                    f"{record.current:.3f}" if record.current else '',
-                    f"{record.power_output:.2f}" if record.power_output else '',
-                    f"{record.raspberry_pi_voltage:.2f}" if record.raspberry_pi_voltage else '',
-                    f"{record.raspberry_pi_current:.1f}" if record.raspberry_pi_current else '',
-                    f"{record.raspberry_pi_power:.2f}" if record.raspberry_pi_power else '',
-                    f"{record.ns_actuator_angle:.1f}" if record.ns_actuator_angle else '',
-                    f"{record.ns_actuator_extension:.0f}" if record.ns_actuator_extension else '',
-                    f"{record.ew_actuator_angle:.1f}" if record.ew_actuator_angle else '',
-                    f"{record.ew_actuator_extension:.0f}" if record.ew_actuator_extension else '',
-                    f"{record.actuator_total_voltage:.2f}" if record.actuator_total_voltage else '',
-                    f"{record.actuator_total_current:.1f}" if record.actuator_total_current else '',
-                    f"{record.actuator_total_power:.2f}" if record.actuator_total_power else '',
-                    f"{record.light_intensity:.1f}" if record.light_intensity else '',
-                    f"{record.temperature:.1f}" if record.temperature else '',
-                    f"{record.humidity:.1f}" if record.humidity else '',
-                    record.notes or ''
-                ])
-            
-            return response
-            
-        except Exception as e:
-            return Response(
-                {"error": f"匯出失敗: {str(e)}"}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+            # 系統只有少數幾筆：先一次查出名稱對照，主查詢不必 JOIN SystemGroup
+            system_names = dict(SystemGroup.objects.values_list('id', 'name'))
+            # values_list 直接取回 tuple，省去逐筆建立 model instance
+            export_rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=2000)
+            for row in export_rows:
+                yield writer.writerow(format_export_row(row, system_names))
+        
+        response = StreamingHttpResponse(rows(), content_type='text/csv; charset=utf-8')
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        response['Content-Disposition'] = f'attachment; filename="power_records_{timestamp}.csv"'
+        return response
+
+# RealTimeDataSerializer 中可直接對應到 PowerRecord 欄位的鍵（device_id 不寫入資料庫）
+REALTIME_RECORD_FIELDS = tuple(
+    name for name in RealTimeDataSerializer().fields if name != 'device_id'
+)
+
+# 批次 upsert 遇到相同 (system, timestamp) 時要覆寫的欄位
+UPSERT_UPDATE_FIELDS = [
+    name for name in REALTIME_RECORD_FIELDS if name not in ('system_id', 'timestamp')
+]
+
+def build_power_record(data):
+    """由驗證後的實時數據建立（尚未寫入的）PowerRecord；衍生功率欄位已於驗證時補上"""
+    values = {name: data[name] for name in REALTIME_RECORD_FIELDS if data.get(name) is not None}
+    return PowerRecord(**values)
 
 class RealTimeDataViewSet(viewsets.ViewSet):
     """專門處理樹莓派實時數據的API"""
     
-    def create(self, request):
-        """接收實時數據"""
-        serializer = RealTimeDataSerializer(data=request.data)
-        
-        if serializer.is_valid():
-            data = serializer.validated_data
-            
+    def _parse_payload(self, request):
+        """解碼並驗證上傳資料，回傳 (rows, many, error_response)"""
+        if _MSGSPEC_OK and request.content_type.startswith('application/json'):
+            # 快速路徑：msgspec 直接由 request.body 解碼＋驗證，不經 DRF parser/serializer
             try:
-                # 檢查系統是否存在
-                try:
-                    system = SystemGroup.objects.get(id=data['system_id'])
-                except SystemGroup.DoesNotExist:
-                    return Response({
-                        "status": "error",
-                        "message": f"系統ID {data['system_id']} 不存在"
-                    }, status=status.HTTP_400_BAD_REQUEST)
-                
-                # 創建PowerRecord
-                power_record = PowerRecord(
-                    system_id=data['system_id'],
-                    voltage=data['voltage'],
-                    current=data['current'],
-                    power_output=data.get('power_output', data['voltage'] * data['current']),
-                    light_intensity=data.get('light_intensity'),
-                    temperature=data.get('temperature'),
-                    humidity=data.get('humidity'),
-                    panel_azimuth=data.get('panel_azimuth'),
-                    panel_tilt=data.get('panel_tilt'),
-                    notes=data.get('notes', '')
-                )
-                
-                # 樹莓派電源數據
-                power_record.raspberry_pi_voltage = data.get('raspberry_pi_voltage')
-                power_record.raspberry_pi_current = data.get('raspberry_pi_current')
-                power_record.raspberry_pi_power = data.get('raspberry_pi_power')
-                
-                # 南北推桿
-                power_record.ns_actuator_angle = data.get('ns_actuator_angle')
-                power_record.ns_actuator_extension = data.get('ns_actuator_extension')
-                
-                # 東西推桿
-                power_record.ew_actuator_angle = data.get('ew_actuator_angle')
-                power_record.ew_actuator_extension = data.get('ew_actuator_extension')
-                
-                # 推桿總功率
-                power_record.actuator_total_voltage = data.get('actuator_total_voltage')
-                power_record.actuator_total_current = data.get('actuator_total_current')
-                power_record.actuator_total_power = data.get('actuator_total_power')
-                
-                # 舊版推桿欄位（保留向下相容）
-                power_record.actuator_voltage = data.get('actuator_voltage')
-                power_record.actuator_current = data.get('actuator_current')
-                power_record.actuator_power = data.get('actuator_power')
-                power_record.actuator_angle = data.get('actuator_angle')
-                power_record.actuator_extension = data.get('actuator_extension')
-                
-                # 保存記錄
-                power_record.save()
-                
-                return Response({
-                    "status": "success",
-                    "message": "數據已保存",
-                    "record_id": power_record.id
-                }, status=status.HTTP_201_CREATED)
-                
-            except Exception as e:
-                return Response({
+                rows, many = decode_realtime_payload(request.body)
+            except (msgspec.DecodeError, msgspec.ValidationError) as e:
+                return None, False, Response({
                     "status": "error",
-                    "message": f"保存數據時發生錯誤: {str(e)}"
-                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        else:
-            return Response({
+                    "message": "數據驗證失敗",
+                    "errors": str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+            return rows, many, None
+        
+        # 表單 / browsable API，或未安裝 msgspec 時
+        many = isinstance(request.data, list)
+        serializer = RealTimeDataSerializer(data=request.data, many=many)
+        if not serializer.is_valid():
+            return None, many, Response({
                 "status": "error",
                 "message": "數據驗證失敗",
                 "errors": serializer.errors
-            }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            }, status=status.HTTP_400_BAD_REQUEST)
+        rows = serializer.validated_data if many else [serializer.validated_data]
+        return rows, many, None
+    
+    def create(self, request):
+        """接收實時數據（單筆 dict，或補傳時的多筆 list）"""
+        rows, many, error = self._parse_payload(request)
+        if error is not None:
+            return error
+        
+        if many:
+            return self._create_batch(rows)
+        
+        data = rows[0]
+        # 檢查系統是否存在（短暫快取，不必每次上傳都查詢）
+        if not system_exists(data['system_id']):
+            return Response({
+                "status": "error",
+                "message": f"系統ID {data['system_id']} 不存在"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # 創建並保存PowerRecord；重送相同 (system, timestamp) 時覆寫既有記錄，與批次路徑的 upsert 一致
+        power_record = build_power_record(data)
+        try:
+            try:
+                with transaction.atomic():
+                    power_record.save()
+            except IntegrityError:
+                power_record.id = self._overwrite_existing(power_record)
+                if power_record.id is None:
+                    raise
+        except DatabaseError as e:
+            return Response({
+                "status": "error",
+                "message": f"保存數據時發生錯誤: {str(e)}"
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        return Response({
+            "status": "success",
+            "message": "數據已保存",
+            "record_id": power_record.id
+        }, status=status.HTTP_201_CREATED)
+    
+    def _overwrite_existing(self, power_record):
+        """以 power_record 的值覆寫同 (system, timestamp) 的既有記錄，回傳其 id（找不到時為 None）"""
+        existing = PowerRecord.objects.filter(
+            system_id=power_record.system_id, timestamp=power_record.timestamp
+        )
+        record_id = existing.values_list('id', flat=True).first()
+        if record_id is not None:
+            existing.update(**{name: getattr(power_record, name) for name in UPSERT_UPDATE_FIELDS})
+            # update() 不會觸發 post_save，需自行讓最新記錄快取失效
+            invalidate_latest(power_record.system_id)
+        return record_id
+    
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        """批次上傳專用端點：單筆 dict 也走 bulk_create 路徑"""
+        rows, _, error = self._parse_payload(request)
+        if error is not None:
+            return error
+        if not rows:
+            return Response({
+                "status": "error",
+                "message": "沒有可保存的數據"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        return self._create_batch(rows)
+    
+    def _create_batch(self, rows):
+        """批次寫入：衍生欄位已預先計算，以 bulk_create 一次多列 INSERT"""
+        system_ids = {row['system_id'] for row in rows}
+        missing = system_ids - set(
+            SystemGroup.objects.filter(id__in=system_ids).values_list('id', flat=True)
+        )
+        if missing:
+            return Response({
+                "status": "error",
+                "message": f"系統ID {', '.join(map(str, sorted(missing)))} 不存在"
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # 重送的 (system, timestamp) 由資料庫 ON CONFLICT / ON DUPLICATE KEY 直接覆寫，
+        # 不需逐筆先查詢是否存在；MySQL 不支援指定 unique_fields（以唯一鍵自動判斷）
+        conflict_options = {'update_conflicts': True, 'update_fields': UPSERT_UPDATE_FIELDS}
+        if connection.features.supports_update_conflicts_with_target:
+            conflict_options['unique_fields'] = ['system', 'timestamp']
+        
+        try:
+            records = PowerRecord.objects.bulk_create(
+                [build_power_record(row) for row in rows], batch_size=500, **conflict_options
+            )
+        except DatabaseError as e:
+            return Response({
+                "status": "error",
+                "message": f"保存數據時發生錯誤: {str(e)}"
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        # bulk_create 不會觸發 post_save，需自行讓最新記錄快取失效
+        invalidate_latest(*system_ids)
+        
+        return Response({
+            "status": "success",
+            "message": "數據已保存",
+            "record_count": len(records)
+        }, status=status.HTTP_201_CREATED)
@@ -15,6 +15,7 @@ z3a_api.py  ——  QY-Z3A IoT 採集裝置歷史數據代理 API
 """
 
 import base64, json, logging, os, threading, time
+from datetime import datetime, timezone
 
 # requests 是選用依賴（Docker 環境可能尚未安裝）
 # 若未安裝，Z3A 端點會回傳 503，其他 API 不受影響
@@ -239,7 +240,6 @@ class Z3AStatusView(View):
                 "base_url": _BASE,
                 "error": "requests 套件未安裝，請執行 docker-compose build"
             })
-        from datetime import datetime, timezone
         tok = _get_token()
         exp = _jwt_exp(tok) if tok else 0
         exp_str = (datetime.fromtimestamp(exp, tz=timezone.utc)
@@ -266,7 +266,6 @@ class Z3ARefreshView(View):
         _token_exp = 0
         new_tok = _get_token()
         if new_tok:
-            from datetime import datetime, timezone
             exp = _jwt_exp(new_tok)
             exp_str = (datetime.fromtimestamp(exp, tz=timezone.utc)
                        .strftime('%Y-%m-%d %H:%M UTC')) if exp else 'N/A'
@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    # 壓縮 JSON / CSV 匯出 / 儀表板 HTML；需在其他會讀寫回應內容的 middleware 之前
+    'django.middleware.gzip.GZipMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -86,6 +88,27 @@ DATABASES = {
         'PASSWORD': os.environ.get('SQL_PASSWORD', 'userpassword123'),
         'HOST': os.environ.get('SQL_HOST', 'localhost'),
         'PORT': os.environ.get('SQL_PORT', '3306'),
+        # 持續連線：同一 worker 的後續請求重用 MySQL 連線，省去每次 TCP + 驗證往返
+        # （runserver 每個請求一個執行緒、結束即關閉連線，正式部署於 gunicorn 等才有效果）
+        'CONN_MAX_AGE': int(os.environ.get('SQL_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+if DATABASES['default']['ENGINE'] == 'django.db.backends.mysql':
+    DATABASES['default']['OPTIONS'] = {
+        'charset': 'utf8mb4',
+        'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+    }
+
+# 快取：設定 REDIS_URL（例如 redis://redis:6379/0，需安裝 redis 套件）時使用 Redis，
+# 否則使用記憶體快取（runserver 單一行程即足夠）
+_redis_url = os.environ.get('REDIS_URL', '')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': _redis_url,
+    } if _redis_url else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -107,6 +130,10 @@ STATICFILES_DIRS = [
 # REST Framework設定
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'dashboard.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,  # 每頁顯示 20 筆記錄
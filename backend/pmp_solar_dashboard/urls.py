@@ -2,20 +2,33 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.contrib.auth import views as auth_views
 from django.shortcuts import redirect
 import os
 
+def _dashboard_file_path():
+    return os.path.join(settings.BASE_DIR, 'static', 'dashboard.html')
+
+def _dashboard_etag(request):
+    """以檔案 mtime + 大小作為 ETag，檔案未變更時瀏覽器重新整理可得 304"""
+    try:
+        stat = os.stat(_dashboard_file_path())
+    except FileNotFoundError:
+        return None
+    return f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_dashboard_etag)
 def dashboard_view(request):
     """需要登入才能訪問的儀表板"""
-    static_file_path = os.path.join(settings.BASE_DIR, 'static', 'dashboard.html')
     try:
-        with open(static_file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return HttpResponse(content, content_type='text/html')
+        # FileResponse 以 file wrapper 串流送出，不必先讀成 Python 字串
+        return FileResponse(open(_dashboard_file_path(), 'rb'), content_type='text/html; charset=utf-8')
     except FileNotFoundError:
         return HttpResponse('儀表板檔案未找到', status=404)
 
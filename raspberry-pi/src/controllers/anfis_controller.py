@@ -44,7 +44,6 @@ ANFIS 模型輸入特徵（9 維，與訓練時完全一致）：
     illumination                照度 W/m²（四 LDR 校正後平均值）
 """
 
-import os
 import math
 import time
 import json
@@ -53,7 +52,7 @@ import numpy as np
 import requests
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, Tuple
 
 # ── 硬體導入 ─────────────────────────────────────────────────────
 try:
@@ -175,14 +174,16 @@ CONFIG = {
 }
 
 # ── 日誌 ─────────────────────────────────────────────────────────
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler('anfis_controller.log'),
-        logging.StreamHandler()
-    ]
-)
+# 只在尚未設定日誌時建立 handler（被其他程式 import 時不重複開啟 log 檔）
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s [%(levelname)s] %(message)s',
+        handlers=[
+            logging.FileHandler('anfis_controller.log'),
+            logging.StreamHandler()
+        ]
+    )
 logger = logging.getLogger(__name__)
 
 
@@ -368,35 +369,70 @@ class ANFISModel:
         now:          當下時間
         illumination: 照度（W/m²，四 LDR 校正平均值）
         """
+        return float(self.predict_batch([beta], [phi], now, illumination)[0])
+
+    def predict_batch(self, betas, phis,
+                      now: datetime, illumination: float) -> np.ndarray:
+        """
+        一次預測多組 (β, φ) 的發電功率（W），回傳與輸入等長的陣列。
+        格網掃描用：整個格網只呼叫一次模型，避免逐點 predict 的開銷。
+        """
+        betas = np.asarray(betas, dtype=float)
+        phis  = np.asarray(phis,  dtype=float)
+        X = self._angle_features(betas, phis)
+        return self._predict_features(X, betas, phis, now, illumination)
+
+    def prepare_grid(self, betas, phis):
+        """
+        預先建立固定格網的特徵矩陣（β/φ 的 sin/cos 欄位只算一次），
+        之後每次循環由 predict_grid() 原地填入時間與照度欄位。
+        """
+        self._grid_betas = np.asarray(betas, dtype=float)
+        self._grid_phis  = np.asarray(phis,  dtype=float)
+        self._grid_X = self._angle_features(self._grid_betas, self._grid_phis)
+
+    def predict_grid(self, now: datetime, illumination: float) -> np.ndarray:
+        """預測 prepare_grid() 格網上每一點的發電功率（W）"""
+        return self._predict_features(self._grid_X,
+                                      self._grid_betas, self._grid_phis,
+                                      now, illumination)
+
+    def _angle_features(self, betas: np.ndarray,
+                        phis: np.ndarray) -> np.ndarray:
+        """建立特徵矩陣並填入角度欄位；時間、照度欄位留給 _predict_features"""
+        # Keras 模型以 float32 運算，直接以 float32 建立，省去每次推論的轉型
+        X = np.empty((len(betas), 9 if self.has_illumination else 8),
+                     dtype=np.float32)
+        X[:, 4] = np.sin(np.radians(betas))                 # tilt_sin
+        X[:, 5] = np.cos(np.radians(betas))                 # tilt_cos
+        X[:, 6] = np.sin(np.radians(phis))                  # azimuth_sin
+        X[:, 7] = np.cos(np.radians(phis))                  # azimuth_cos
+        return X
+
+    def _predict_features(self, X: np.ndarray,
+                          betas: np.ndarray, phis: np.ndarray,
+                          now: datetime, illumination: float) -> np.ndarray:
         # 特徵工程（與訓練時完全一致）
         hour_dec = now.hour + now.minute / 60.0 + now.second / 3600.0
         day_of_year = now.timetuple().tm_yday
 
-        features = [
-            math.sin(2 * math.pi * hour_dec   / 24),   # hour_sin
-            math.cos(2 * math.pi * hour_dec   / 24),   # hour_cos
-            math.sin(2 * math.pi * day_of_year / 365), # day_sin
-            math.cos(2 * math.pi * day_of_year / 365), # day_cos
-            math.sin(math.radians(beta)),               # tilt_sin
-            math.cos(math.radians(beta)),               # tilt_cos
-            math.sin(math.radians(phi)),                # azimuth_sin
-            math.cos(math.radians(phi)),                # azimuth_cos
-        ]
+        X[:, 0] = math.sin(2 * math.pi * hour_dec   / 24)   # hour_sin
+        X[:, 1] = math.cos(2 * math.pi * hour_dec   / 24)   # hour_cos
+        X[:, 2] = math.sin(2 * math.pi * day_of_year / 365) # day_sin
+        X[:, 3] = math.cos(2 * math.pi * day_of_year / 365) # day_cos
         if self.has_illumination:
-            features.append(illumination)              # illumination
-
-        X = np.array(features).reshape(1, -1)
+            X[:, 8] = illumination                          # illumination
 
         if self.loaded:
             X_scaled = self.scaler.transform(X)
             pred = self.model.predict(X_scaled, verbose=0)
-            return float(max(0.0, pred[0][0]))
+            return np.maximum(0.0, pred[:, 0].astype(float))
         else:
             # 無模型時的模擬預測（僅供測試）
             base = illumination * 0.25
-            tilt_eff = math.cos(math.radians(abs(beta - 20)))
-            az_eff   = math.cos(math.radians(abs(phi - 180) * 0.5))
-            return max(0.0, base * tilt_eff * az_eff)
+            tilt_eff = np.cos(np.radians(np.abs(betas - 20)))
+            az_eff   = np.cos(np.radians(np.abs(phis - 180) * 0.5))
+            return np.maximum(0.0, base * tilt_eff * az_eff)
 
 
 # ════════════════════════════════════════════════════════════════
@@ -408,8 +444,14 @@ class SensorReader:
     LDR 值：ADC 單位 (0-1023) → 依校正係數轉為 W/m²。
     """
 
+    _DIRECTIONS = ('east', 'west', 'south', 'north')
+    # 模擬模式：一次抽出 [基準照度, 東, 西, 南, 北 偏移] 五個亂數
+    _SIM_LDR_LOW  = np.array([300.0, -60.0, -60.0, -60.0, -60.0])
+    _SIM_LDR_HIGH = np.array([800.0,  60.0,  60.0,  60.0,  60.0])
+
     def __init__(self):
         cfg = CONFIG['mcp3008']
+        self._rng = np.random.default_rng()
         if HARDWARE_AVAILABLE:
             self._adc = {
                 'east':  MCP3008(channel=cfg['east_ch'],
@@ -430,10 +472,8 @@ class SensorReader:
     def read_ldr_raw(self) -> Dict[str, float]:
         """讀取 ADC 原始值（0-1023）"""
         if CONFIG['simulation_mode']:
-            import random
-            base = random.uniform(300, 800)
-            return {d: round(base + random.uniform(-60, 60))
-                    for d in ('east', 'west', 'south', 'north')}
+            base, *offsets = self._rng.uniform(self._SIM_LDR_LOW, self._SIM_LDR_HIGH)
+            return {d: round(base + off) for d, off in zip(self._DIRECTIONS, offsets)}
 
         if not HARDWARE_AVAILABLE:
             raise RuntimeError(
@@ -442,7 +482,7 @@ class SensorReader:
 
         try:
             return {d: round(self._adc[d].value * 1023)
-                    for d in ('east', 'west', 'south', 'north')}
+                    for d in self._DIRECTIONS}
         except Exception as e:
             raise RuntimeError(f"LDR 讀取失敗（感測器可能斷線或接觸不良）: {e}") from e
 
@@ -463,8 +503,7 @@ class SensorReader:
               實作後移除 simulation_mode fallback。
         """
         if CONFIG['simulation_mode']:
-            import random
-            return random.uniform(50, 200)
+            return float(self._rng.uniform(50, 200))
 
         # TODO 範例（INA3221 實作後取消註解）：
         # from ina3221 import INA3221
@@ -524,11 +563,15 @@ class ActuatorController:
 # ════════════════════════════════════════════════════════════════
 # Django API 上傳
 # ════════════════════════════════════════════════════════════════
+# 整個控制迴圈共用同一個 Session：keep-alive 重用 TCP 連線，不必每次循環重新建立
+_http = requests.Session()
+
+
 def upload_log(payload: dict):
     """上傳本次循環的完整記錄到 Django API"""
     try:
         url = f"{CONFIG['api_url']}/power-records/"
-        resp = requests.post(url, json=payload, timeout=10)
+        resp = _http.post(url, json=payload, timeout=10)
         if resp.status_code in (200, 201):
             logger.info("log 上傳成功")
         else:
@@ -543,21 +586,49 @@ def upload_log(payload: dict):
 # ════════════════════════════════════════════════════════════════
 class ANFISTrackingController:
 
+    # 預測誤差環形緩衝區大小（系統性誤差檢測只用最近 20 筆）
+    _ERR_RING_SIZE = 64
+
     def __init__(self, model_dir: str = '.'):
         self.anfis    = ANFISModel(model_dir)
         self.sensor   = SensorReader()
         self.actuator = ActuatorController()
         self.ina3221  = INA3221Reader()
 
+        # 格網掃描的角度組合固定不變：啟動時建好一次
+        # （β 外層、φ 內層，與逐點掃描順序相同）
+        cfg = CONFIG['search']
+        betas    = np.arange(cfg['tilt_min'],    cfg['tilt_max']    + 1e-9,
+                             cfg['tilt_step'])
+        azimuths = np.arange(cfg['azimuth_min'], cfg['azimuth_max'] + 1e-9,
+                             cfg['azimuth_step'])
+        grid_b, grid_p = np.meshgrid(betas, azimuths, indexing='ij')
+        self._grid_b, self._grid_p = grid_b.ravel(), grid_p.ravel()
+        self.anfis.prepare_grid(self._grid_b, self._grid_p)
+
+        # 每個循環都會用到的門檻／範圍：啟動後不再變動，先取出成屬性
+        th = CONFIG['thresholds']
+        self._power_tol      = th['power_expectation']
+        self._move_thresh    = th['movement_worthiness']
+        self._ft_improve     = th['fine_tune_improve']
+        self._sys_err_thresh = th['systematic_error']
+        self._corr_min, self._corr_max   = CONFIG['corr_min'], CONFIG['corr_max']
+        self._sun_start, self._sun_end   = (CONFIG['sun_start_hour'],
+                                            CONFIG['sun_end_hour'])
+        self._tilt_lo, self._tilt_hi     = cfg['tilt_min'], cfg['tilt_max']
+        self._az_lo,   self._az_hi       = cfg['azimuth_min'], cfg['azimuth_max']
+
         # 校正係數（系統性誤差修正，初始為 1.0）
         self.correction = 1.0
 
-        # 近期預測誤差記錄（用於系統性誤差檢測）
-        self._recent_errors = []   # [(predicted_W, actual_W), ...]
+        # 近期預測誤差記錄（actual_W − predicted_W，固定大小環形緩衝區）
+        self._err_ring  = np.zeros(self._ERR_RING_SIZE, dtype=np.float32)
+        self._err_idx   = 0   # 下一筆寫入位置（累計筆數）
+        self._err_count = 0   # 緩衝區內有效筆數
 
     # ── 工具 ─────────────────────────────────────────────────────
     def _is_sun_time(self, now: datetime) -> bool:
-        return CONFIG['sun_start_hour'] <= now.hour < CONFIG['sun_end_hour']
+        return self._sun_start <= now.hour < self._sun_end
 
     def _grid_search_best_angle(
         self, now: datetime, illumination: float
@@ -566,47 +637,41 @@ class ANFISTrackingController:
         格網掃描搜尋最佳角度。
         回傳 (best_beta, best_phi, best_predicted_power_W)
         """
-        cfg  = CONFIG['search']
-        betas    = np.arange(cfg['tilt_min'],    cfg['tilt_max']    + 1e-9,
-                             cfg['tilt_step'])
-        azimuths = np.arange(cfg['azimuth_min'], cfg['azimuth_max'] + 1e-9,
-                             cfg['azimuth_step'])
-
-        best_beta, best_phi, best_power = (
-            self.actuator.beta, self.actuator.phi, -1.0
-        )
-
-        for b in betas:
-            for p in azimuths:
-                raw_pred = self.anfis.predict(b, p, now, illumination)
-                corrected = raw_pred * self.correction
-                if corrected > best_power:
-                    best_power = corrected
-                    best_beta, best_phi = b, p
+        corrected = self.anfis.predict_grid(now, illumination) * self.correction
+        best = int(np.argmax(corrected))
+        best_beta  = float(self._grid_b[best])
+        best_phi   = float(self._grid_p[best])
+        best_power = float(corrected[best])
 
         logger.info("格網掃描最佳角度 β=%.1f° φ=%.1f° 預測=%.2fW",
                     best_beta, best_phi, best_power)
         return best_beta, best_phi, best_power
 
+    def _record_error(self, predicted: float, actual: float):
+        self._err_ring[self._err_idx % self._ERR_RING_SIZE] = actual - predicted
+        self._err_idx += 1
+        self._err_count = min(self._err_count + 1, self._ERR_RING_SIZE)
+
     def _check_systematic_error(self) -> bool:
         """
         檢測近 20 筆誤差是否存在系統性偏差。
         若存在，更新校正係數並回傳 True。
         """
-        if len(self._recent_errors) < 10:
+        if self._err_count < 10:
             return False
 
-        recent = self._recent_errors[-20:]
-        errors = [actual - predicted for predicted, actual in recent]
-        mean_err = np.mean(errors)
+        n = min(20, self._err_count)
+        recent = self._err_ring.take(range(self._err_idx - n, self._err_idx),
+                                     mode='wrap')
+        mean_err = float(recent.mean())
 
-        if abs(mean_err) > CONFIG['thresholds']['systematic_error']:
+        if abs(mean_err) > self._sys_err_thresh:
             old = self.correction
             if mean_err > 0:
-                self.correction = min(CONFIG['corr_max'],
+                self.correction = min(self._corr_max,
                                       self.correction * 1.05)
             else:
-                self.correction = max(CONFIG['corr_min'],
+                self.correction = max(self._corr_min,
                                       self.correction * 0.95)
             logger.info("系統性誤差 %.2fW → 校正係數 %.3f → %.3f",
                         mean_err, old, self.correction)
@@ -617,7 +682,7 @@ class ANFISTrackingController:
         self, current_power: float, predicted_power: float
     ) -> bool:
         gain = predicted_power - current_power
-        worth = gain > CONFIG['thresholds']['movement_worthiness']
+        worth = gain > self._move_thresh
         logger.info("移動評估：當前=%.2fW 預測=%.2fW 增益=%.2fW 值得=%s",
                     current_power, predicted_power, gain, worth)
         return worth
@@ -628,7 +693,7 @@ class ANFISTrackingController:
         if expected <= 0:
             return True
         ratio = actual / expected
-        return ratio >= CONFIG['thresholds']['power_expectation']
+        return ratio >= self._power_tol
 
     def _fine_tune(self, ldr_cal: Dict[str, float]) -> Tuple[float, float]:
         """
@@ -641,12 +706,12 @@ class ANFISTrackingController:
         d_beta = 0.0
 
         if abs(ew) > cfg['ldr_threshold']:
-            d_phi = np.sign(ew) * min(
-                cfg['max_az_adj'], abs(ew) * cfg['az_step_per_unit']
+            d_phi = math.copysign(
+                min(cfg['max_az_adj'], abs(ew) * cfg['az_step_per_unit']), ew
             )
         if abs(ns) > cfg['ldr_threshold']:
-            d_beta = np.sign(ns) * min(
-                cfg['max_tl_adj'], abs(ns) * cfg['tl_step_per_unit']
+            d_beta = math.copysign(
+                min(cfg['max_tl_adj'], abs(ns) * cfg['tl_step_per_unit']), ns
             )
         return d_beta, d_phi
 
@@ -671,81 +736,93 @@ class ANFISTrackingController:
                 self._grid_search_best_angle(now, illumination)
 
             # 記錄本次預測誤差（用上次移動後的實際功率）
-            self._recent_errors.append((predicted_power, current_power))
-            if len(self._recent_errors) > 100:
-                self._recent_errors = self._recent_errors[-50:]
+            self._record_error(predicted_power, current_power)
 
-            # 若有系統性誤差，修正後重新掃描一次
+            # 若有系統性誤差，更新校正係數；校正係數是整個格網共用的正數倍率，
+            # 最佳角度不變，直接換算預測值即可，不必重新掃描
+            prev_correction = self.correction
             if self._check_systematic_error():
-                best_beta, best_phi, predicted_power = \
-                    self._grid_search_best_angle(now, illumination)
+                predicted_power *= self.correction / prev_correction
 
             # ── Step 4：評估是否值得移動 ────────────────────────
-            if not self._is_worth_moving(current_power, predicted_power):
-                logger.info("增益不足，等待下一次循環")
-                self._upload_cycle_log(now, ldr_cal, illumination,
-                                       current_power, best_beta, best_phi,
-                                       predicted_power, moved=False,
-                                       experience='skip')
-                self._wait_or_end(now)
-                continue
-
-            # ── Step 5：移動至預測角度 ──────────────────────────
-            self.actuator.move_to_azalt(best_beta, best_phi)
-            time.sleep(3)   # 等待推桿穩定（非阻塞式等待，3秒已足夠）
-            power_after_move = self.sensor.read_power()
-
-            # ── Step 6：判斷發電量是否接近預期 ─────────────────
-            if self._power_meets_expectation(power_after_move, predicted_power):
-                logger.info("發電量符合預期 %.2fW ≥ %.0f%%×%.2fW，記錄成功",
-                            power_after_move,
-                            CONFIG['thresholds']['power_expectation'] * 100,
-                            predicted_power)
-                experience = 'success'
+            moved = self._is_worth_moving(current_power, predicted_power)
+            if moved:
+                power_after_move, experience = self._move_and_verify(
+                    best_beta, best_phi, predicted_power, ldr_cal)
             else:
-                # ── Step 7：模糊規則微調 ──────────────────────
-                logger.info("發電量低於預期，進行模糊微調")
-                d_beta, d_phi = self._fine_tune(ldr_cal)
-
-                if abs(d_beta) > 0.05 or abs(d_phi) > 0.05:
-                    pre_tune_beta = self.actuator.beta
-                    pre_tune_phi  = self.actuator.phi
-                    new_beta = max(CONFIG['search']['tilt_min'],
-                                  min(CONFIG['search']['tilt_max'],
-                                      self.actuator.beta + d_beta))
-                    new_phi  = max(CONFIG['search']['azimuth_min'],
-                                  min(CONFIG['search']['azimuth_max'],
-                                      self.actuator.phi  + d_phi))
-                    self.actuator.move_to_azalt(new_beta, new_phi)
-
-                    # 等待穩定後檢查微調效果（不使用 time.sleep(30)，改為短等）
-                    time.sleep(5)
-                    power_after_tune = self.sensor.read_power()
-                    improvement = power_after_tune - power_after_move
-
-                    if improvement >= CONFIG['thresholds']['fine_tune_improve']:
-                        logger.info("微調成功 +%.2fW，保持新位置", improvement)
-                        experience = 'fine_tune_success'
-                        power_after_move = power_after_tune
-                    else:
-                        logger.info("微調無效 %.2fW，回退", improvement)
-                        self.actuator.move_to_azalt(pre_tune_beta, pre_tune_phi)
-                        experience = 'fine_tune_fail'
-                else:
-                    logger.info("LDR 差值不足，不執行微調")
-                    experience = 'no_fine_tune'
+                logger.info("增益不足，等待下一次循環")
+                power_after_move, experience = None, 'skip'
 
             # ── Step 8：上傳 log（替代「更新模型」步驟）────────
             self._upload_cycle_log(now, ldr_cal, illumination,
                                    current_power, best_beta, best_phi,
                                    predicted_power,
-                                   moved=True,
+                                   moved=moved,
                                    power_after_move=power_after_move,
                                    experience=experience)
 
             # ── Step 9：判斷太陽時間 ──────────────────────────
             self._wait_or_end(now)
 
+    def _move_and_verify(self, best_beta: float, best_phi: float,
+                         predicted_power: float,
+                         ldr_cal: Dict[str, float]) -> Tuple[float, str]:
+        """
+        Step 5–7：移動至預測角度，檢查發電量，必要時模糊微調。
+        回傳 (移動後功率, 經驗標記)
+        """
+        # ── Step 5：移動至預測角度 ──────────────────────────
+        self.actuator.move_to_azalt(best_beta, best_phi)
+        self._settle(3)   # 等待推桿穩定（3秒已足夠）
+        power_after_move = self.sensor.read_power()
+
+        # ── Step 6：判斷發電量是否接近預期 ─────────────────
+        if self._power_meets_expectation(power_after_move, predicted_power):
+            logger.info("發電量符合預期 %.2fW ≥ %.0f%%×%.2fW，記錄成功",
+                        power_after_move,
+                        self._power_tol * 100,
+                        predicted_power)
+            experience = 'success'
+        else:
+            # ── Step 7：模糊規則微調 ──────────────────────
+            logger.info("發電量低於預期，進行模糊微調")
+            d_beta, d_phi = self._fine_tune(ldr_cal)
+
+            if abs(d_beta) > 0.05 or abs(d_phi) > 0.05:
+                pre_tune_beta = self.actuator.beta
+                pre_tune_phi  = self.actuator.phi
+                new_beta = max(self._tilt_lo,
+                              min(self._tilt_hi,
+                                  self.actuator.beta + d_beta))
+                new_phi  = max(self._az_lo,
+                              min(self._az_hi,
+                                  self.actuator.phi  + d_phi))
+                self.actuator.move_to_azalt(new_beta, new_phi)
+
+                # 等待穩定後檢查微調效果（不使用 time.sleep(30)，改為短等）
+                self._settle(5)
+                power_after_tune = self.sensor.read_power()
+                improvement = power_after_tune - power_after_move
+
+                if improvement >= self._ft_improve:
+                    logger.info("微調成功 +%.2fW，保持新位置", improvement)
+                    experience = 'fine_tune_success'
+                    power_after_move = power_after_tune
+                else:
+                    logger.info("微調無效 %.2fW，回退", improvement)
+                    self.actuator.move_to_azalt(pre_tune_beta, pre_tune_phi)
+                    experience = 'fine_tune_fail'
+            else:
+                logger.info("LDR 差值不足，不執行微調")
+                experience = 'no_fine_tune'
+
+        return power_after_move, experience
+
+    def _settle(self, seconds: float):
+        """等待推桿移動後穩定；模擬模式下推桿不會實際動作，直接略過"""
+        if not CONFIG['simulation_mode']:
+            time.sleep(seconds)
+
     def _wait_or_end(self, now: datetime):
         """等待間隔時間，或太陽時間結束時回歸初始位置"""
         if not self._is_sun_time(now):
@@ -25,7 +25,6 @@ ANFIS v5/v6/v8 推論模組（為控制器封裝）
     # result = {'best_angle': (20, 180), 'predicted_power': 245.3,
     #           'all_predictions': {(20, 180): 245.3, ...}}
 """
-import os
 import math
 import json
 import logging
@@ -99,6 +98,9 @@ SITE_LATITUDE  = 25.10   # 新北先鋒
 SITE_LONGITUDE = 121.43
 SITE_ALTITUDE  = 50
 
+# POA (W/m²) → 預期功率 (W) 的固定倍率：area × eff 預先相乘
+_WATTS_PER_POA = PANEL_AREA_M2 * PANEL_EFF_STC
+
 
 @dataclass
 class InferenceResult:
@@ -182,96 +184,103 @@ class AnfisInference:
         except Exception as e:
             logger.exception("ANFIS 模型載入失敗: %s", e)
 
+    # ─────────────────────────────────────────────────────────
+    # 太陽位置（pvlib）
+    # ─────────────────────────────────────────────────────────
+    def _solar_position(self, timestamp: datetime) -> Tuple[float, float]:
+        """回傳 (apparent_zenith, azimuth)（度）；同一時刻所有候選角度共用"""
+        ts = pd.DatetimeIndex([pd.to_datetime(timestamp)])
+        if ts.tz is None:
+            ts = ts.tz_localize('Asia/Taipei', ambiguous='NaT',
+                                 nonexistent='shift_forward')
+        solpos = pvlib.solarposition.get_solarposition(
+            ts, self.lat, self.lon, altitude=self.altitude)
+        return (float(np.asarray(solpos['apparent_zenith'])[0]),
+                float(np.asarray(solpos['azimuth'])[0]))
+
     # ─────────────────────────────────────────────────────────
     # POA 計算（pvlib）
     # ─────────────────────────────────────────────────────────
     def compute_poa(self, timestamp: datetime, ghi_wm2: float,
-                    candidate_angles: List[Tuple[float, float]]) -> np.ndarray:
+                    candidate_angles: List[Tuple[float, float]],
+                    solar: Optional[Tuple[float, float]] = None
+                    ) -> np.ndarray:
         """
         對候選角度集合計算 POA（W/m²）
         回傳 shape (N,) ndarray，順序與 candidate_angles 一致
+        solar: 預先算好的 (apparent_zenith, azimuth)；None 時自行計算
         """
         if not PVLIB_AVAILABLE:
             raise RuntimeError("pvlib 未安裝")
 
-        # 包裝 timestamp（pvlib 需要 DatetimeIndex）
-        ts = pd.DatetimeIndex([pd.to_datetime(timestamp)])
-        if ts.tz is None:
-            ts = ts.tz_localize('Asia/Taipei', ambiguous='NaT',
-                                 nonexistent='shift_forward')
-
-        solpos = pvlib.solarposition.get_solarposition(
-            ts, self.lat, self.lon, altitude=self.altitude
-        )
-        zenith  = float(np.asarray(solpos['apparent_zenith'])[0])
-        sun_azi = float(np.asarray(solpos['azimuth'])[0])
+        zenith, sun_azi = solar or self._solar_position(timestamp)
 
         # Erbs decomposition
         ghi_arr = np.array([max(ghi_wm2, 0.0)], dtype=float)
         zenith_arr = np.array([zenith])
-        dayofyear = np.array([ts.dayofyear[0]])
+        dayofyear = np.array([timestamp.timetuple().tm_yday])
         erbs = pvlib.irradiance.erbs(ghi_arr, zenith_arr, dayofyear)
         dni = float(np.asarray(erbs['dni'])[0])
         dhi = float(np.asarray(erbs['dhi'])[0])
         dni_extra = float(np.asarray(
             pvlib.irradiance.get_extra_radiation(dayofyear))[0])
 
-        # 對每個候選角度算 POA
-        poa_arr = np.zeros(len(candidate_angles), dtype=float)
-        for i, (tilt, azi) in enumerate(candidate_angles):
-            poa = pvlib.irradiance.get_total_irradiance(
-                surface_tilt=float(tilt),
-                surface_azimuth=float(azi),
-                solar_zenith=zenith,
-                solar_azimuth=sun_azi,
-                dni=dni, ghi=ghi_wm2, dhi=dhi,
-                dni_extra=dni_extra,
-                model='haydavies',
-            )
-            v = poa['poa_global']
-            v = float(v) if not hasattr(v, '__iter__') else float(np.asarray(v).item())
-            poa_arr[i] = max(v, 0.0)
-        return poa_arr
+        # 所有候選角度一次送入 pvlib（surface_tilt / surface_azimuth 為陣列）
+        tilts, azis = np.asarray(candidate_angles, dtype=float).reshape(-1, 2).T
+        poa = pvlib.irradiance.get_total_irradiance(
+            surface_tilt=tilts,
+            surface_azimuth=azis,
+            solar_zenith=zenith,
+            solar_azimuth=sun_azi,
+            dni=dni, ghi=ghi_wm2, dhi=dhi,
+            dni_extra=dni_extra,
+            model='haydavies',
+        )
+        poa_arr = np.asarray(poa['poa_global'], dtype=float)
+        return np.maximum(poa_arr, 0.0)
 
     # ─────────────────────────────────────────────────────────
     # 特徵向量構造
     # ─────────────────────────────────────────────────────────
     def _build_features(self, timestamp: datetime,
-                         tilt: float, azi: float,
+                         tilt, azi,
                          illumination_wm2: float,
-                         panel_calib: Optional[float] = None) -> np.ndarray:
-        """根據 model_version 構造特徵向量（與訓練時一致）"""
+                         panel_calib: Optional[float] = None,
+                         solar: Optional[Tuple[float, float]] = None
+                         ) -> np.ndarray:
+        """
+        根據 model_version 構造特徵矩陣（與訓練時一致），shape (N, 特徵數)
+        tilt / azi 可為純量或等長陣列：整批候選角度一次以 NumPy 計算
+        solar: 預先算好的 (apparent_zenith, azimuth)；None 時自行計算
+        """
+        t  = np.radians(np.atleast_1d(np.asarray(tilt, dtype=float)))
+        pa = np.radians(np.atleast_1d(np.asarray(azi,  dtype=float)))
+
         hour_dec = (timestamp.hour + timestamp.minute / 60.0
                     + timestamp.second / 3600.0)
         doy      = timestamp.timetuple().tm_yday
 
+        # 與角度無關的欄位為純量，寫入矩陣時自動 broadcast
         feat = {}
         feat['hour_sin']    = math.sin(2 * math.pi * hour_dec / 24)
         feat['hour_cos']    = math.cos(2 * math.pi * hour_dec / 24)
         feat['day_sin']     = math.sin(2 * math.pi * doy / 365)
         feat['day_cos']     = math.cos(2 * math.pi * doy / 365)
-        feat['tilt_sin']    = math.sin(math.radians(tilt))
-        feat['tilt_cos']    = math.cos(math.radians(tilt))
-        feat['azimuth_sin'] = math.sin(math.radians(azi))
-        feat['azimuth_cos'] = math.cos(math.radians(azi))
+        feat['tilt_sin']    = np.sin(t)
+        feat['tilt_cos']    = np.cos(t)
+        feat['azimuth_sin'] = np.sin(pa)
+        feat['azimuth_cos'] = np.cos(pa)
         feat['clearness']   = max(0.0, min(1.5, illumination_wm2 / 1000.0))
 
         # v6 特徵
         if 'cos_incidence' in self.feature_columns:
-            # 需要 solar zenith / azimuth；輕量算法
-            ts = pd.DatetimeIndex([pd.to_datetime(timestamp)])
-            if ts.tz is None:
-                ts = ts.tz_localize('Asia/Taipei', ambiguous='NaT',
-                                     nonexistent='shift_forward')
-            solpos = pvlib.solarposition.get_solarposition(
-                ts, self.lat, self.lon, altitude=self.altitude)
-            z  = math.radians(float(np.asarray(solpos['apparent_zenith'])[0]))
-            sa = math.radians(float(np.asarray(solpos['azimuth'])[0]))
-            t  = math.radians(tilt)
-            pa = math.radians(azi)
-            cos_inc = (math.cos(z) * math.cos(t) +
-                       math.sin(z) * math.sin(t) * math.cos(sa - pa))
-            feat['cos_incidence']   = max(-1.0, min(1.0, cos_inc))
+            # 需要 solar zenith / azimuth
+            zenith, sun_azi = solar or self._solar_position(timestamp)
+            z  = math.radians(zenith)
+            sa = math.radians(sun_azi)
+            cos_inc = (math.cos(z) * feat['tilt_cos'] +
+                       math.sin(z) * feat['tilt_sin'] * np.cos(sa - pa))
+            feat['cos_incidence']   = np.clip(cos_inc, -1.0, 1.0)
             feat['sin_solar_elev']  = math.cos(z)
 
         # v8 特徵
@@ -279,10 +288,11 @@ class AnfisInference:
             feat['panel_calib'] = panel_calib if panel_calib is not None \
                                   else self.default_panel_calib
 
-        # 依 feature_columns 順序排成 vector
-        vec = np.array([feat[col] for col in self.feature_columns],
-                        dtype='float32').reshape(1, -1)
-        return vec
+        # 依 feature_columns 順序填入矩陣
+        X = np.empty((len(t), len(self.feature_columns)), dtype='float32')
+        for j, col in enumerate(self.feature_columns):
+            X[:, j] = feat[col]
+        return X
 
     # ─────────────────────────────────────────────────────────
     # 主 API：預測最佳角度
@@ -310,17 +320,17 @@ class AnfisInference:
         if not self._loaded:
             raise RuntimeError("ANFIS 模型未載入，無法推論")
 
+        # 太陽位置只跟時刻有關：POA 與特徵共用同一次計算
+        solar = self._solar_position(timestamp)
+
         # Step 1: 算每個候選角度的 POA
         poa_arr = self.compute_poa(timestamp, illumination_wm2,
-                                    candidate_angles)
-
-        # Step 2: 構造每個角度的特徵向量並 stack
-        X_list = []
-        for tilt, azi in candidate_angles:
-            x = self._build_features(timestamp, tilt, azi,
-                                      illumination_wm2, panel_calib)
-            X_list.append(x)
-        X = np.concatenate(X_list, axis=0)
+                                    candidate_angles, solar)
+
+        # Step 2: 一次構造所有候選角度的特徵矩陣
+        tilts, azis = np.asarray(candidate_angles, dtype=float).T
+        X = self._build_features(timestamp, tilts, azis,
+                                  illumination_wm2, panel_calib, solar)
         X_scaled = self.scaler.transform(X)
 
         # Step 3: ANFIS 推論 PR
@@ -329,7 +339,7 @@ class AnfisInference:
 
         # Step 4: 回推實際功率
         # expected_power = PR × POA × area × eff
-        power_pred = pr_pred * poa_arr * PANEL_AREA_M2 * PANEL_EFF_STC
+        power_pred = pr_pred * poa_arr * _WATTS_PER_POA
 
         # Step 5: 找最佳
         best_idx = int(np.argmax(power_pred))
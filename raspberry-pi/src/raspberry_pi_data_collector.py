@@ -9,7 +9,7 @@ import json
 import requests
 from datetime import datetime
 import logging
-import random  # 用於模擬數據
+import numpy as np  # 用於模擬數據
 
 # 日誌設定
 logging.basicConfig(
@@ -18,10 +18,23 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 模擬雜訊範圍（每次讀取一次抽出四個值）：[電壓, 電流, 溫度, 濕度]
+SIM_DAY_LOW    = np.array([-2.0, -0.5, 25.0, 50.0])   # 白天：電壓/電流為基準值的擾動
+SIM_DAY_HIGH   = np.array([ 2.0,  0.5, 35.0, 80.0])
+SIM_NIGHT_LOW  = np.array([ 0.0,  0.0, 18.0, 60.0])   # 夜晚：電壓/電流為絕對值
+SIM_NIGHT_HIGH = np.array([ 0.5,  0.1, 25.0, 90.0])
+
+# 各小時的發電係數（索引 = 小時，0 = 夜晚）：早晚 0.3、上午下午 0.7、中午 1.0
+TIME_FACTORS = ((0.0,) * 6 + (0.3, 0.3, 0.7, 0.7) + (1.0,) * 5
+                + (0.7, 0.7, 0.3, 0.3) + (0.0,) * 5)
+
 class SolarDataCollector:
     def __init__(self, config_file='config.json'):
         """初始化數據採集器"""
         self.load_config(config_file)
+        self._rng = np.random.default_rng()
+        # 上傳與連線測試共用同一個 Session，keep-alive 重用 TCP/TLS 連線
+        self._session = requests.Session()
         
     def load_config(self, config_file):
         """載入配置檔案"""
@@ -76,64 +89,58 @@ class SolarDataCollector:
         """讀取感測器數據"""
         try:
             if self.simulation_mode:
-                # 模擬真實的太陽能板數據
-                hour = datetime.now().hour
-                
-                # 根據時間模擬不同的發電狀況
-                if 6 <= hour <= 18:  # 白天
-                    # 模擬太陽能板在不同時間的發電情況
-                    time_factor = 1.0
-                    if hour < 8 or hour > 16:  # 早晚
-                        time_factor = 0.3
-                    elif 10 <= hour <= 14:  # 中午
-                        time_factor = 1.0
-                    else:  # 上午下午
-                        time_factor = 0.7
-                    
-                    base_voltage = 20.0 * time_factor
-                    base_current = 3.0 * time_factor
-                    
-                    # 加入一些隨機變動（模擬雲層等影響）
-                    voltage = base_voltage + random.uniform(-2, 2)
-                    current = base_current + random.uniform(-0.5, 0.5)
-                    
-                    # 環境數據
-                    temperature = random.uniform(25, 35)
-                    humidity = random.uniform(50, 80)
-                    
-                else:  # 夜晚
-                    voltage = random.uniform(0, 0.5)
-                    current = random.uniform(0, 0.1)
-                    temperature = random.uniform(18, 25)
-                    humidity = random.uniform(60, 90)
-                
-                # 確保數值為正
-                voltage = max(0, voltage)
-                current = max(0, current)
-                power = voltage * current
-                
-                return {
-                    'voltage': round(voltage, 2),
-                    'current': round(current, 3),
-                    'power_output': round(power, 2),
-                    'temperature': round(temperature, 1),
-                    'humidity': round(humidity, 1),
-                    'light_intensity': round(power * 50, 1) if power > 0 else 0,  # 模擬光照強度
-                    'panel_azimuth': 180.0,  # 假設固定朝南
-                    'panel_tilt': 20.0,      # 假設固定傾角
-                    'timestamp': datetime.now().isoformat(),
-                    'device_id': self.device_id,
-                    'sensor_status': 'normal'
-                }
+                return self._read_simulated()
             else:
                 # 這裡之後會替換為真實感測器代碼
+                # 目前直接改用模擬數據（不可再呼叫 read_sensors，否則會無限遞迴）
                 logger.warning("真實感測器模式尚未實現，使用模擬數據")
-                return self.read_sensors()  # 遞迴調用模擬模式
+                return self._read_simulated()
             
         except Exception as e:
             logger.error(f"感測器讀取錯誤: {e}")
             return None
     
+    def _read_simulated(self):
+        """產生模擬的太陽能板數據"""
+        # 模擬真實的太陽能板數據（同一次讀取只取一次時間）
+        now = datetime.now()
+        hour = now.hour
+        
+        # 根據時間模擬不同的發電狀況（查表取得該小時的發電係數）
+        time_factor = TIME_FACTORS[hour]
+        if time_factor > 0:  # 白天
+            base_voltage = 20.0 * time_factor
+            base_current = 3.0 * time_factor
+            
+            # 加入一些隨機變動（模擬雲層等影響）與環境數據，一次抽出
+            dv, di, temperature, humidity = \
+                self._rng.uniform(SIM_DAY_LOW, SIM_DAY_HIGH).tolist()
+            voltage = base_voltage + dv
+            current = base_current + di
+            
+        else:  # 夜晚
+            voltage, current, temperature, humidity = \
+                self._rng.uniform(SIM_NIGHT_LOW, SIM_NIGHT_HIGH).tolist()
+        
+        # 確保數值為正
+        voltage = max(0, voltage)
+        current = max(0, current)
+        power = voltage * current
+        
+        return {
+            'voltage': round(voltage, 2),
+            'current': round(current, 3),
+            'power_output': round(power, 2),
+            'temperature': round(temperature, 1),
+            'humidity': round(humidity, 1),
+            'light_intensity': round(power * 50, 1) if power > 0 else 0,  # 模擬光照強度
+            'panel_azimuth': 180.0,  # 假設固定朝南
+            'panel_tilt': 20.0,      # 假設固定傾角
+            'timestamp': now.isoformat(),
+            'device_id': self.device_id,
+            'sensor_status': 'normal'
+        }
+    
     def upload_data(self, data):
         """上傳數據到Django API"""
         try:
@@ -152,7 +159,7 @@ class SolarDataCollector:
             }
             
             # 發送到 RealTimeData API
-            response = requests.post(
+            response = self._session.post(
                 f"{self.api_url}/realtime-data/",
                 json=api_data,
                 headers={'Content-Type': 'application/json'},
@@ -177,21 +184,11 @@ class SolarDataCollector:
     def save_local_backup(self, data):
         """本地備份數據（網路故障時使用）"""
         try:
-            backup_file = f"backup_data_{datetime.now().strftime('%Y%m%d')}.json"
-            
-            # 讀取現有備份
-            try:
-                with open(backup_file, 'r', encoding='utf-8') as f:
-                    backup_data = json.load(f)
-            except FileNotFoundError:
-                backup_data = []
-            
-            # 添加新數據
-            backup_data.append(data)
+            # JSON Lines：每筆一行、只追加，不必每次讀回並重寫整天的備份
+            backup_file = f"backup_data_{datetime.now().strftime('%Y%m%d')}.jsonl"
             
-            # 儲存備份
-            with open(backup_file, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, indent=2, ensure_ascii=False)
+            with open(backup_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(data, ensure_ascii=False) + '\n')
             
             logger.info("數據已保存到本地備份")
             
@@ -201,7 +198,7 @@ class SolarDataCollector:
     def test_api_connection(self):
         """測試API連接"""
         try:
-            response = requests.get(
+            response = self._session.get(
                 f"{self.api_url}/realtime-data/status/",
                 timeout=5
             )
@@ -234,14 +231,17 @@ class SolarDataCollector:
         
         logger.info("🎯 開始數據採集...")
         
+        self._next_tick = time.monotonic()
         while True:
             try:
+                self._next_tick += self.collection_interval
+                
                 # 讀取感測器數據
                 sensor_data = self.read_sensors()
                 
                 if sensor_data is None:
                     logger.warning("感測器讀取失敗，跳過本次採集")
-                    time.sleep(self.collection_interval)
+                    self._wait_next_tick()
                     continue
                 
                 # 顯示讀取的數據
@@ -258,7 +258,7 @@ class SolarDataCollector:
                     self.save_local_backup(sensor_data)
                 
                 # 等待下次採集
-                time.sleep(self.collection_interval)
+                self._wait_next_tick()
                 
             except KeyboardInterrupt:
                 logger.info("👋 用戶中斷，停止數據採集")
@@ -266,6 +266,16 @@ class SolarDataCollector:
             except Exception as e:
                 logger.error(f"主循環錯誤: {e}")
                 time.sleep(5)  # 錯誤後短暫等待
+    
+    def _wait_next_tick(self):
+        """等待到下一個採集節拍（time.monotonic 排程，讀取與上傳耗時不會累積成漂移）"""
+        delay = self._next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # 已落後（例如上傳逾時）：不補跑錯過的節拍，從現在重新起算
+            logger.warning(f"採集落後 {-delay:.2f} 秒")
+            self._next_tick = time.monotonic()
 
 def main():
     """主程式"""
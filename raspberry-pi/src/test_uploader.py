@@ -8,6 +8,7 @@
 """
 import RPi.GPIO as GPIO
 import time
+import os
 import sys
 import tty
 import termios
@@ -15,10 +16,19 @@ import select
 from datetime import datetime
 import csv
 import threading
+import queue
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import struct
 from SDL_Pi_INA3221 import INA3221
 
+try:
+    from smbus2 import SMBus, i2c_msg
+    SMBUS2_AVAILABLE = True
+except ImportError:
+    SMBUS2_AVAILABLE = False
+
 # ==================== 網站配置 ====================
 # 請修改為你的實際 IP 和端口
 API_BASE_URL = "http://140.114.59.214:8000/api"
@@ -27,6 +37,12 @@ SYSTEM_ID = 1  # 請修改為你系統的 ID（從 Django admin 查看）
 # 數據上傳設定
 UPLOAD_INTERVAL = 5.0  # 每秒上傳一次（可調整）
 UPLOAD_ENABLED = True  # 是否啟用上傳功能
+UPLOAD_BATCH_SIZE = 20  # 每次 POST 最多合併的筆數
+UPLOAD_BATCH_WAIT = 0.5  # 湊批次最多等待秒數
+UPLOAD_QUEUE_SIZE = 64  # 上傳佇列上限（約 6 秒的 10Hz 數據）
+UPLOAD_SPOOL_FILE = "upload_spool.jsonl"  # 上傳失敗的數據暫存於此，連線恢復後補傳
+SPOOL_RETRY_INTERVAL = 30.0  # 補傳最短間隔（秒）
+SPOOL_CHUNK_SIZE = 200  # 補傳時每次 POST 的筆數
 
 # ==================== GPIO定義 ====================
 # 推桿1（方位角 Azimuth）- 206mm行程
@@ -49,6 +65,8 @@ TILT_HALL2 = 26
 # INA3221設定
 INA3221_ADDRESS = 0x40
 SHUNT_RESISTOR = 0.1  # 0.1Ω 分流電阻
+INA3221_SHUNT_LSB = 40e-6  # 分流電壓 40µV/LSB
+INA3221_BUS_LSB = 8e-3  # 匯流排電壓 8mV/LSB
 
 # 推桿參數
 AZ_PULSES_PER_MM = 54.19
@@ -58,7 +76,10 @@ TILT_STROKE_MM = 406
 
 # ==================== 優化參數 ====================
 AUTO_STOP_TIMEOUT = 0.5
-POLL_INTERVAL = 0.01
+DEAD_TIME = 0.01  # 推桿斷電到再次通電的最短間隔（秒）
+CSV_FLUSH_INTERVAL = 5.0  # CSV 寫入緩衝的最長保留秒數
+LOG_QUEUE_SIZE = 256  # 待寫入記錄佇列上限
+DISPLAY_INTERVAL = 1.0  # 狀態列最短更新間隔（秒），內容未變時不重印
 DEBUG_MODE = False
 
 
@@ -73,23 +94,35 @@ class ActuatorController:
         self.blue_low = blue_low
         self.current_state = None
         
-        GPIO.setup([brown_high, blue_high, brown_low, blue_low], GPIO.OUT)
-        self.stop()
+        # 初始即全部拉低，current_state=None 代表四個腳位確實為 LOW
+        GPIO.setup([brown_high, blue_high, brown_low, blue_low], GPIO.OUT, initial=GPIO.LOW)
+        self._deenergized_at = time.monotonic()
         print(f"  ✓ {name} 推桿控制器初始化")
     
+    def _wait_dead_time(self):
+        """距上次斷電未滿 DEAD_TIME 時補足剩餘時間（防止 H 橋擊穿短路）"""
+        remaining = DEAD_TIME - (time.monotonic() - self._deenergized_at)
+        if remaining > 0:
+            time.sleep(remaining)
+    
     def extend(self):
         if self.current_state == 'extend':
             return
-        GPIO.output([self.brown_high, self.blue_low], GPIO.LOW)
-        time.sleep(0.01)
+        # 反轉時先關閉另一組並記錄斷電時間；停止後再反轉同樣要等滿死區時間
+        if self.current_state == 'retract':
+            GPIO.output([self.brown_high, self.blue_low], GPIO.LOW)
+            self._deenergized_at = time.monotonic()
+        self._wait_dead_time()
         GPIO.output([self.blue_high, self.brown_low], GPIO.HIGH)
         self.current_state = 'extend'
     
     def retract(self):
         if self.current_state == 'retract':
             return
-        GPIO.output([self.blue_high, self.brown_low], GPIO.LOW)
-        time.sleep(0.01)
+        if self.current_state == 'extend':
+            GPIO.output([self.blue_high, self.brown_low], GPIO.LOW)
+            self._deenergized_at = time.monotonic()
+        self._wait_dead_time()
         GPIO.output([self.brown_high, self.blue_low], GPIO.HIGH)
         self.current_state = 'retract'
     
@@ -98,6 +131,7 @@ class ActuatorController:
             return
         GPIO.output([self.brown_high, self.blue_high, 
                     self.brown_low, self.blue_low], GPIO.LOW)
+        self._deenergized_at = time.monotonic()
         self.current_state = None
 
 
@@ -111,107 +145,138 @@ class HallSensorMonitor:
         self.pulses_per_mm = pulses_per_mm
         self.stroke_mm = stroke_mm
         
+        # 邊緣回呼只累加整數脈衝，位置在讀取時才換算
         self.pulse_count = 0
-        self.position_mm = 0.0
-        self.monitoring = True
+        self._mm_per_pulse = 1.0 / pulses_per_mm
         
         GPIO.setup([hall1_pin, hall2_pin], GPIO.IN, pull_up_down=GPIO.PUD_UP)
         self.last_hall1 = GPIO.input(hall1_pin)
         
-        self.monitor_thread = threading.Thread(target=self._hall_monitor)
-        self.monitor_thread.daemon = True
-        self.monitor_thread.start()
+        # HALL1 雙緣中斷觸發，取代每 0.1ms 輪詢的背景線程
+        GPIO.add_event_detect(hall1_pin, GPIO.BOTH, callback=self._on_edge)
         
         print(f"  ✓ {name} 霍爾感測器監控啟動")
     
-    def _hall_monitor(self):
-        while self.monitoring:
-            hall1 = GPIO.input(self.hall1_pin)
-            hall2 = GPIO.input(self.hall2_pin)
-            
-            if hall1 != self.last_hall1:
-                if hall1 == hall2:
-                    self.pulse_count -= 1
-                else:
-                    self.pulse_count += 1
-                
-                self.position_mm = self.pulse_count / self.pulses_per_mm
-                self.last_hall1 = hall1
+    def _on_edge(self, channel):
+        """HALL1 邊緣回呼：以 HALL2 相位判斷方向"""
+        hall1 = GPIO.input(self.hall1_pin)
+        hall2 = GPIO.input(self.hall2_pin)
+        
+        if hall1 != self.last_hall1:
+            if hall1 == hall2:
+                self.pulse_count -= 1
+            else:
+                self.pulse_count += 1
             
-            time.sleep(0.0001)
+            self.last_hall1 = hall1
     
     def get_position(self):
-        return self.position_mm
+        return self.pulse_count * self._mm_per_pulse
     
     def get_pulse_count(self):
         return self.pulse_count
     
     def get_position_percentage(self):
-        return (self.position_mm / self.stroke_mm) * 100.0
+        return (self.get_position() / self.stroke_mm) * 100.0
     
     def reset_position(self):
         self.pulse_count = 0
-        self.position_mm = 0.0
     
     def stop(self):
-        self.monitoring = False
+        GPIO.remove_event_detect(self.hall1_pin)
 
 
 class DualPowerMonitor:
     """INA3221雙通道電源監控器"""
     
+    # CH1/CH2 的 (分流, 匯流排) 電壓暫存器
+    _REGS = (0x01, 0x02, 0x03, 0x04)
+    
     def __init__(self, address=0x40, shunt_resistor=0.1):
         self.ina = None
         self.ch1_enabled = False
         self.ch2_enabled = False
+        self.address = address
+        self.shunt_resistor = shunt_resistor
+        self._bus = None
         
         print(f"\n正在初始化 INA3221 雙通道監控...")
         
         try:
             self.ina = INA3221(bus_num=1, addr=address, shunt_resistor=shunt_resistor)
-            
-            # 測試CH1（24V推桿系統）
-            print(f"\n  【CH1 - 24V推桿系統】")
+        except Exception as e:
+            print(f"  ✗ INA3221 初始化失敗: {e}")
+            return
+        
+        # 直接存取 I²C，一次讀回兩通道（初始化檢測與 read_all_fast 共用）
+        if SMBUS2_AVAILABLE:
             try:
-                ch1_voltage = self.ina.bus_voltage(1)
-                ch1_current = self.ina.current(1)
-                ch1_power = self.ina.power(1) / 1000.0
-                
-                print(f"    電壓: {ch1_voltage:.2f}V")
-                print(f"    電流: {ch1_current:.1f}mA")
-                print(f"    功率: {ch1_power:.2f}W")
-                
-                if ch1_voltage > 5.0:  # 確保有實際電壓
-                    print(f"    ✓ CH1 監控正常")
-                    self.ch1_enabled = True
-                else:
-                    print(f"    ⚠️ 警告: 電壓偏低")
-                
+                self._bus = SMBus(1)
             except Exception as e:
-                print(f"    ✗ CH1 讀取失敗: {e}")
-            
-            # 測試CH2（24V樹莓派供電）
-            print(f"\n  【CH2 - 24V樹莓派供電】")
+                print(f"  ⚠️ 無法開啟 I²C 匯流排，改用逐項讀取: {e}")
+        
+        readings = None
+        if self._bus is not None:
             try:
-                ch2_voltage = self.ina.bus_voltage(2)
-                ch2_current = self.ina.current(2)
-                ch2_power = self.ina.power(2) / 1000.0
+                readings = self._burst_read()
+            except Exception as e:
+                print(f"  ⚠️ I²C 批次讀取失敗，改用逐項讀取: {e}")
+                self._bus.close()
+                self._bus = None
+        
+        # 測試CH1（24V推桿系統）與CH2（24V樹莓派供電）
+        enabled = [False, False]
+        for ch, label in ((1, "24V推桿系統"), (2, "24V樹莓派供電")):
+            print(f"\n  【CH{ch} - {label}】")
+            try:
+                if readings is not None:
+                    voltage, current, power = readings[ch - 1]
+                else:
+                    voltage, current, power = self._read_channel(ch)
                 
-                print(f"    電壓: {ch2_voltage:.2f}V")
-                print(f"    電流: {ch2_current:.1f}mA")
-                print(f"    功率: {ch2_power:.2f}W")
+                print(f"    電壓: {voltage:.2f}V")
+                print(f"    電流: {current:.1f}mA")
+                print(f"    功率: {power:.2f}W")
                 
-                if ch2_voltage > 5.0:
-                    print(f"    ✓ CH2 監控正常")
-                    self.ch2_enabled = True
+                if voltage > 5.0:  # 確保有實際電壓
+                    print(f"    ✓ CH{ch} 監控正常")
+                    enabled[ch - 1] = True
                 else:
                     print(f"    ⚠️ 警告: 電壓偏低")
                 
             except Exception as e:
-                print(f"    ✗ CH2 讀取失敗: {e}")
-            
-        except Exception as e:
-            print(f"  ✗ INA3221 初始化失敗: {e}")
+                print(f"    ✗ CH{ch} 讀取失敗: {e}")
+        
+        self.ch1_enabled, self.ch2_enabled = enabled
+    
+    def _read_channel(self, ch):
+        """經由 INA3221 函式庫逐項讀取單一通道 (V, mA, W)"""
+        voltage = self.ina.bus_voltage(ch)
+        current = self.ina.current(ch)
+        power = self.ina.power(ch) / 1000.0
+        return voltage, current, power
+    
+    def _burst_read(self):
+        """一次 i2c_rdwr 讀取 CH1/CH2 的分流與匯流排電壓，在本地計算電流與功率
+        
+        INA3221 讀取時不會自動遞增暫存器指標，因此每個暫存器仍各需一組
+        「寫指標 + 讀 2 bytes」，但全部合併在同一次 ioctl 內完成。
+        """
+        msgs = []
+        for reg in self._REGS:
+            msgs.append(i2c_msg.write(self.address, [reg]))
+            msgs.append(i2c_msg.read(self.address, 2))
+        self._bus.i2c_rdwr(*msgs)
+        
+        raw = struct.unpack(">4h", b"".join(bytes(m) for m in msgs[1::2]))
+        channels = []
+        for ch in range(2):
+            shunt_v = (raw[2 * ch] >> 3) * INA3221_SHUNT_LSB
+            voltage = (raw[2 * ch + 1] >> 3) * INA3221_BUS_LSB
+            current = shunt_v / self.shunt_resistor * 1000.0  # mA
+            power = voltage * current / 1000.0  # W
+            channels.append((voltage, current, power))
+        return channels
     
     def read_ch1(self):
         """讀取CH1 (24V推桿系統)"""
@@ -219,10 +284,7 @@ class DualPowerMonitor:
             return None, None, None
         
         try:
-            voltage = self.ina.bus_voltage(1)
-            current = self.ina.current(1)
-            power = self.ina.power(1) / 1000.0
-            return voltage, current, power
+            return self._read_channel(1)
         except:
             return None, None, None
     
@@ -232,10 +294,7 @@ class DualPowerMonitor:
             return None, None, None
         
         try:
-            voltage = self.ina.bus_voltage(2)
-            current = self.ina.current(2)
-            power = self.ina.power(2) / 1000.0
-            return voltage, current, power
+            return self._read_channel(2)
         except:
             return None, None, None
     
@@ -244,7 +303,25 @@ class DualPowerMonitor:
         ch2_data = self.read_ch2()
         return ch1_data, ch2_data
     
+    def read_all_fast(self):
+        """以單次 I²C 批次讀取取得兩通道數據，格式同 read_all()"""
+        if self._bus is None or not (self.ch1_enabled or self.ch2_enabled):
+            return self.read_all()
+        
+        try:
+            ch1_data, ch2_data = self._burst_read()
+        except Exception:
+            return (None, None, None), (None, None, None)
+        
+        if not self.ch1_enabled:
+            ch1_data = (None, None, None)
+        if not self.ch2_enabled:
+            ch2_data = (None, None, None)
+        return ch1_data, ch2_data
+    
     def close(self):
+        if self._bus:
+            self._bus.close()
         if self.ina:
             self.ina.close()
 
@@ -259,21 +336,29 @@ class WebUploader:
         self.success_count = 0
         self.fail_count = 0
         self.last_upload_time = time.time()
+        self.connected = None  # 連線測試完成前為 None
+        
+        # 共用 keep-alive 連線，避免每次上傳都重新建立 TCP 連線
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         
         print(f"\n【網站數據上傳器初始化】")
         print(f"  API URL: {self.upload_url}")
         print(f"  系統 ID: {self.system_id}")
+        print(f"  連線測試於背景進行...")
         
-        # 測試連接
-        if self.test_connection():
-            print(f"  ✓ 網站連接正常")
-        else:
-            print(f"  ⚠️ 無法連接到網站，數據將僅本地保存")
+        # 背景上傳線程：先測試連線，之後控制迴圈只負責排入佇列，不等待網路
+        self.last_spool_retry = float('-inf')
+        self.q = queue.Queue(maxsize=UPLOAD_QUEUE_SIZE)
+        self.worker = threading.Thread(target=self._drain, daemon=True)
+        self.worker.start()
     
     def test_connection(self):
         """測試網站連接"""
         try:
-            response = requests.get(f"{self.base_url}/systems/", timeout=3)
+            response = self.session.get(f"{self.base_url}/systems/", timeout=3)
             return response.status_code == 200
         except:
             return False
@@ -282,6 +367,7 @@ class WebUploader:
         """上傳數據到網站
         
         data_dict 應包含:
+        - timestamp: 取樣時間（ISO 8601 字串；未提供時以目前時間代替）
         - voltage: 太陽能板電壓
         - current: 太陽能板電流
         - power_output: 太陽能板功率
@@ -299,6 +385,8 @@ class WebUploader:
         # 準備上傳的數據（包含所有新欄位）
         payload = {
             "system_id": self.system_id,
+            # 批次上傳時以取樣時間為準，而非伺服器收到的時間
+            "timestamp": data_dict.get("timestamp") or datetime.now().isoformat(),
             # 太陽能板數據
             "voltage": data_dict.get("voltage", 0.0),
             "current": data_dict.get("current", 0.0),
@@ -329,28 +417,133 @@ class WebUploader:
         }
         
         try:
-            response = requests.post(
+            self.q.put_nowait(payload)
+            return True, "已排入上傳佇列"
+        except queue.Full:
+            self.fail_count += 1
+            return False, "上傳佇列已滿"
+    
+    def _drain(self):
+        """背景線程：取出佇列中的數據，湊成批次後一次上傳"""
+        # 測試連接（不阻塞主程式初始化；連不上仍照常嘗試上傳）
+        self.connected = self.test_connection()
+        if self.connected:
+            print(f"\n  ✓ 網站連接正常")
+            # 啟動時先補傳上次未送出的數據
+            self._retry_spool()
+        else:
+            print(f"\n  ⚠️ 無法連接到網站，上傳失敗的數據將暫存於 {UPLOAD_SPOOL_FILE}")
+        
+        running = True
+        while running:
+            payload = self.q.get()
+            if payload is None:
+                break
+            
+            batch = [payload]
+            deadline = time.monotonic() + UPLOAD_BATCH_WAIT
+            while len(batch) < UPLOAD_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    payload = self.q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if payload is None:
+                    running = False
+                    break
+                batch.append(payload)
+            
+            self._post(batch)
+    
+    def _post(self, batch):
+        """以 JSON 陣列一次上傳多筆（後端 realtime-data 以 bulk_create 寫入）"""
+        try:
+            response = self.session.post(
                 self.upload_url, 
-                json=payload,
-                headers={"Content-Type": "application/json"},
+                json=batch,
                 timeout=2
             )
             
             if response.status_code in [200, 201]:
-                self.success_count += 1
+                self.success_count += len(batch)
                 self.last_upload_time = time.time()
+                self._retry_spool()
                 return True, "上傳成功"
             else:
-                self.fail_count += 1
+                self.fail_count += len(batch)
+                # 4xx 為數據本身有誤，重送也不會成功
+                if response.status_code >= 500:
+                    self._spool(batch)
                 return False, f"HTTP {response.status_code}: {response.text[:100]}"
                 
         except requests.exceptions.Timeout:
-            self.fail_count += 1
+            self.fail_count += len(batch)
+            self._spool(batch)
             return False, "上傳超時"
         except Exception as e:
-            self.fail_count += 1
+            self.fail_count += len(batch)
+            self._spool(batch)
             return False, f"上傳錯誤: {str(e)}"
     
+    def _spool(self, batch):
+        """將上傳失敗的數據附加到本地暫存檔"""
+        try:
+            with open(UPLOAD_SPOOL_FILE, 'a', encoding='utf-8') as f:
+                for payload in batch:
+                    f.write(json.dumps(payload, ensure_ascii=False) + '\n')
+        except OSError:
+            pass
+    
+    def _retry_spool(self):
+        """補傳暫存檔中的數據（僅在上傳線程中呼叫，最多每 SPOOL_RETRY_INTERVAL 秒一次）"""
+        now = time.monotonic()
+        if now - self.last_spool_retry < SPOOL_RETRY_INTERVAL:
+            return
+        self.last_spool_retry = now
+        
+        if not os.path.exists(UPLOAD_SPOOL_FILE):
+            return
+        
+        pending = []
+        with open(UPLOAD_SPOOL_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    pending.append(json.loads(line))
+                except ValueError:
+                    continue  # 斷電時可能留下不完整的一行
+        
+        sent = 0
+        while sent < len(pending):
+            chunk = pending[sent:sent + SPOOL_CHUNK_SIZE]
+            try:
+                response = self.session.post(self.upload_url, json=chunk, timeout=5)
+            except Exception:
+                break
+            if response.status_code >= 500:
+                break
+            if response.status_code in [200, 201]:
+                self.success_count += len(chunk)
+            sent += len(chunk)
+        
+        # 後端以 (system, timestamp) upsert，重送不會產生重複紀錄
+        if sent >= len(pending):
+            os.remove(UPLOAD_SPOOL_FILE)
+        elif sent:
+            with open(UPLOAD_SPOOL_FILE, 'w', encoding='utf-8') as f:
+                for payload in pending[sent:]:
+                    f.write(json.dumps(payload, ensure_ascii=False) + '\n')
+    
+    def close(self):
+        # 送出結束標記，等待佇列中剩餘數據上傳完畢
+        try:
+            self.q.put(None, timeout=5)
+        except queue.Full:
+            pass
+        self.worker.join(timeout=5)
+        self.session.close()
+    
     def get_stats(self):
         """獲取上傳統計"""
         return {
@@ -361,7 +554,10 @@ class WebUploader:
 
 
 class DataLogger:
-    """數據記錄器（CSV + 網站上傳）"""
+    """數據記錄器（CSV + 網站上傳）
+    
+    控制迴圈只將原始數值排入佇列；格式化、寫檔與上傳都在寫入線程進行。
+    """
     
     def __init__(self, filename=None, uploader=None):
         if filename is None:
@@ -372,7 +568,13 @@ class DataLogger:
         self.file = None
         self.writer = None
         self.uploader = uploader
+        self.last_flush_time = time.time()
+        self.dropped_count = 0
         self.init_file()
+        
+        self._logq = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self._writer_thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer_thread.start()
     
     def init_file(self):
         self.file = open(self.filename, 'w', newline='')
@@ -391,9 +593,46 @@ class DataLogger:
         self.file.flush()
         print(f"  ✓ 數據記錄文件: {self.filename}")
     
-    def log(self, az_data, tilt_data, ch1_data, ch2_data, panel_voltage=0, panel_current=0):
+    def log(self, az_sample, tilt_sample, ch1_data, ch2_data, panel_voltage=0, panel_current=0):
+        """排入一筆記錄
+        
+        az_sample / tilt_sample: (動作, 位置mm, 位置%, 脈衝數)
+        ch1_data / ch2_data: (電壓V, 電流mA, 功率W)，讀取失敗時為 None
+        """
+        try:
+            self._logq.put_nowait((time.time(), az_sample, tilt_sample, ch1_data, ch2_data,
+                                   panel_voltage, panel_current))
+        except queue.Full:
+            self.dropped_count += 1
+    
+    def _write_loop(self):
+        """寫入線程：依序取出記錄並寫檔、上傳"""
+        while True:
+            item = self._logq.get()
+            if item is None:
+                break
+            self._write_row(*item)
+    
+    def _write_row(self, ts, az_sample, tilt_sample, ch1_data, ch2_data, panel_voltage, panel_current):
         """記錄數據並上傳到網站"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        timestamp = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+        
+        az_action, az_pos, az_pct, az_pulse = az_sample
+        tilt_action, tilt_pos, tilt_pct, tilt_pulse = tilt_sample
+        az_data = [az_action, f"{az_pos:.2f}", f"{az_pct:.1f}", az_pulse]
+        tilt_data = [tilt_action, f"{tilt_pos:.2f}", f"{tilt_pct:.1f}", tilt_pulse]
+        
+        # 格式化電源數據
+        ch1_data = [
+            f"{ch1_data[0]:.3f}" if ch1_data[0] is not None else "N/A",
+            f"{ch1_data[1]:.2f}" if ch1_data[1] is not None else "N/A",
+            f"{ch1_data[2]:.3f}" if ch1_data[2] is not None else "N/A"
+        ]
+        ch2_data = [
+            f"{ch2_data[0]:.3f}" if ch2_data[0] is not None else "N/A",
+            f"{ch2_data[1]:.2f}" if ch2_data[1] is not None else "N/A",
+            f"{ch2_data[2]:.3f}" if ch2_data[2] is not None else "N/A"
+        ]
         
         # 計算總功率
         ch1_power = float(ch1_data[2]) if ch1_data[2] != "N/A" else 0
@@ -412,6 +651,8 @@ class DataLogger:
         upload_status = "N/A"
         if self.uploader:
             data_dict = {
+                # 與 CSV 同一個取樣時間，佇列積壓時也不會偏移
+                "timestamp": datetime.fromtimestamp(ts).isoformat(),
                 "voltage": panel_voltage,
                 "current": panel_current,
                 "power_output": panel_voltage * panel_current,
@@ -439,27 +680,43 @@ class DataLogger:
             }
             
             success, message = self.uploader.upload_data(data_dict)
-            upload_status = "OK" if success else "FAIL"
+            upload_status = "QUEUED" if success else "FAIL"
         
         row.append(upload_status)
         self.writer.writerow(row)
-        self.file.flush()
+        
+        # 不逐筆 flush，減少 SD 卡寫入次數；close() 時會寫出剩餘資料
+        now = time.time()
+        if now - self.last_flush_time >= CSV_FLUSH_INTERVAL:
+            self.file.flush()
+            self.last_flush_time = now
     
     def close(self):
+        # 送出結束標記，等待佇列中剩餘記錄寫完
+        try:
+            self._logq.put(None, timeout=5)
+        except queue.Full:
+            pass
+        self._writer_thread.join(timeout=5)
+        
         if self.file:
             self.file.close()
         
+        if self.dropped_count:
+            print(f"\n⚠️ 記錄佇列滿載，共略過 {self.dropped_count} 筆")
+        
         # 顯示上傳統計
         if self.uploader:
+            self.uploader.close()
             stats = self.uploader.get_stats()
             print(f"\n【上傳統計】")
             print(f"  成功: {stats['success']} 次")
             print(f"  失敗: {stats['failed']} 次")
 
 
-def get_key():
-    """非阻塞讀取按鍵"""
-    if select.select([sys.stdin], [], [], 0)[0]:
+def get_key(timeout=0):
+    """讀取按鍵，最多等待 timeout 秒"""
+    if select.select([sys.stdin], [], [], timeout)[0]:
         return sys.stdin.read(1)
     return None
 
@@ -544,16 +801,24 @@ try:
     # 狀態變數
     az_action = None
     tilt_action = None
-    last_key_time = time.time()
-    last_log_time = time.time()
-    last_upload_time = time.time()
+    # 迴圈計時使用 monotonic 時鐘，不受 NTP 校時影響；CSV 時間戳由記錄線程處理
+    last_key_time = time.monotonic()
+    last_log_time = last_key_time
+    last_display_time = last_key_time - DISPLAY_INTERVAL
+    last_status = None
     log_interval = 0.1
     
     while True:
-        key = get_key()
+        # 阻塞等待按鍵，最多等到下一次記錄或自動停止的時間點
+        now = time.monotonic()
+        wait = last_log_time + log_interval - now
+        if az_action or tilt_action:
+            wait = min(wait, last_key_time + AUTO_STOP_TIMEOUT - now)
+        key = get_key(max(0.0, wait))
+        now = time.monotonic()
         
         if key:
-            last_key_time = time.time()
+            last_key_time = now
             key = key.lower()
             
             # 數字鍵組合動作
@@ -641,7 +906,7 @@ try:
                 break
         
         # 自動停止
-        if (az_action or tilt_action) and (time.time() - last_key_time > AUTO_STOP_TIMEOUT):
+        if (az_action or tilt_action) and (now - last_key_time > AUTO_STOP_TIMEOUT):
             if az_action:
                 az_actuator.stop()
                 az_action = None
@@ -650,10 +915,10 @@ try:
                 tilt_action = None
         
         # 定期記錄和顯示數據
-        if time.time() - last_log_time >= log_interval:
+        if now - last_log_time >= log_interval:
             # 讀取兩個通道
-            ch1_data = power_monitor.read_ch1()  # 24V推桿
-            ch2_data = power_monitor.read_ch2()  # 24V樹莓派
+            # CH1: 24V推桿，CH2: 24V樹莓派
+            ch1_data, ch2_data = power_monitor.read_all_fast()
             
             # 位置數據
             az_pos = az_hall.get_position()
@@ -667,47 +932,35 @@ try:
             az_action_str = az_action if az_action else "STOP"
             tilt_action_str = tilt_action if tilt_action else "STOP"
             
-            az_data = [az_action_str, f"{az_pos:.2f}", f"{az_pct:.1f}", az_pulse]
-            tilt_data = [tilt_action_str, f"{tilt_pos:.2f}", f"{tilt_pct:.1f}", tilt_pulse]
-            
-            # 格式化電源數據
-            ch1_formatted = [
-                f"{ch1_data[0]:.3f}" if ch1_data[0] is not None else "N/A",
-                f"{ch1_data[1]:.2f}" if ch1_data[1] is not None else "N/A",
-                f"{ch1_data[2]:.3f}" if ch1_data[2] is not None else "N/A"
-            ]
-            ch2_formatted = [
-                f"{ch2_data[0]:.3f}" if ch2_data[0] is not None else "N/A",
-                f"{ch2_data[1]:.2f}" if ch2_data[1] is not None else "N/A",
-                f"{ch2_data[2]:.3f}" if ch2_data[2] is not None else "N/A"
-            ]
-            
-            # 記錄到CSV和上傳
+            # 原始數值交給記錄線程格式化、寫入CSV和上傳
             # TODO: 這裡應該讀取實際的太陽能板電壓電流，目前使用假數據
             panel_voltage = 0.1
             panel_current = 0.1
             
-            logger.log(az_data, tilt_data, ch1_formatted, ch2_formatted, 
-                      panel_voltage, panel_current)
+            logger.log((az_action_str, az_pos, az_pct, az_pulse),
+                       (tilt_action_str, tilt_pos, tilt_pct, tilt_pulse),
+                       ch1_data, ch2_data, panel_voltage, panel_current)
             
-            # 即時顯示
-            az_symbol = "←" if az_action == 'left' else "→" if az_action == 'right' else "■"
-            tilt_symbol = "↑" if tilt_action == 'up' else "↓" if tilt_action == 'down' else "■"
-            
-            # 顯示上傳狀態
-            upload_indicator = "📡" if UPLOAD_ENABLED else "⊗"
-            stats = uploader.get_stats()
-            
-            if ch1_data[0] is not None and ch2_data[0] is not None:
-                print(f"{upload_indicator} {az_symbol}Az:{az_pos:5.1f}mm({az_pct:4.1f}%) | "
-                      f"{tilt_symbol}Tilt:{tilt_pos:5.1f}mm({tilt_pct:4.1f}%) | "
-                      f"推桿:{ch1_data[0]:5.1f}V {ch1_data[1]:5.0f}mA {ch1_data[2]:5.1f}W | "
-                      f"Upload:{stats['success']}/{stats['success']+stats['failed']}",
-                      end='\r', flush=True)
+            # 即時顯示（限制更新頻率，減少終端/SSH 輸出）
+            if (now - last_display_time >= DISPLAY_INTERVAL
+                    and ch1_data[0] is not None and ch2_data[0] is not None):
+                az_symbol = "←" if az_action == 'left' else "→" if az_action == 'right' else "■"
+                tilt_symbol = "↑" if tilt_action == 'up' else "↓" if tilt_action == 'down' else "■"
+                
+                # 顯示上傳狀態
+                upload_indicator = "📡" if UPLOAD_ENABLED else "⊗"
+                stats = uploader.get_stats()
+                
+                status = (f"{upload_indicator} {az_symbol}Az:{az_pos:5.1f}mm({az_pct:4.1f}%) | "
+                          f"{tilt_symbol}Tilt:{tilt_pos:5.1f}mm({tilt_pct:4.1f}%) | "
+                          f"推桿:{ch1_data[0]:5.1f}V {ch1_data[1]:5.0f}mA {ch1_data[2]:5.1f}W | "
+                          f"Upload:{stats['success']}/{stats['success']+stats['failed']}")
+                if status != last_status:
+                    print(status, end='\r', flush=True)
+                    last_status = status
+                last_display_time = now
             
-            last_log_time = time.time()
-        
-        time.sleep(POLL_INTERVAL)
+            last_log_time = now
 
 except KeyboardInterrupt:
     print("\n\n⚠️ 程序中斷")
@@ -6,6 +6,7 @@
 版本: 1.0
 """
 
+import copy
 import json
 import os
 from pathlib import Path
@@ -13,6 +14,7 @@ from typing import Dict, Any, Optional
 import logging
 from dataclasses import dataclass, asdict
 from datetime import datetime
+from functools import lru_cache
 
 @dataclass
 class HardwareConfig:
@@ -94,14 +96,31 @@ class ConfigManager:
         self.algorithm = AlgorithmConfig()
         self.location = LocationConfig()
         
+        # get_config_dict 的快取；僅 load_config 與 update_*_config 會清除，
+        # 直接改寫屬性（如 cm.hardware.x = ...）不會反映在 get_config_dict 的結果中
+        self._dict_cache: Optional[Dict[str, Any]] = None
+        
+        # 上次載入的 (檔案路徑, mtime_ns)：檔案未變動時 load_config 不重新解析
+        self._loaded_stamp = None
+        
         self.logger = logging.getLogger(__name__)
     
+    def _invalidate_cache(self):
+        """配置變動後清除字典快取"""
+        self._dict_cache = None
+        # 記憶體中的配置已與檔案不同，下次 load_config 必須重新讀檔
+        self._loaded_stamp = None
+    
     def load_config(self, config_file: str = "system_config.json") -> bool:
         """載入配置檔案"""
         config_path = self.config_dir / config_file
         
         try:
             if config_path.exists():
+                stamp = (config_path, config_path.stat().st_mtime_ns)
+                if stamp == self._loaded_stamp:
+                    return True
+                
                 with open(config_path, 'r', encoding='utf-8') as f:
                     config_data = json.load(f)
                 
@@ -114,6 +133,8 @@ class ConfigManager:
                     self.algorithm = AlgorithmConfig(**config_data['algorithm'])
                 if 'location' in config_data:
                     self.location = LocationConfig(**config_data['location'])
+                self._invalidate_cache()
+                self._loaded_stamp = stamp
                 
                 self.logger.info(f"成功載入配置: {config_path}")
                 return True
@@ -152,13 +173,15 @@ class ConfigManager:
             self.logger.error(f"儲存配置失敗: {e}")
     
     def get_config_dict(self) -> Dict[str, Any]:
-        """取得完整配置字典"""
-        return {
-            'hardware': asdict(self.hardware),
-            'system': asdict(self.system),
-            'algorithm': asdict(self.algorithm),
-            'location': asdict(self.location)
-        }
+        """取得完整配置字典（回傳快取的複本；更新配置請用 update_*_config）"""
+        if self._dict_cache is None:
+            self._dict_cache = {
+                'hardware': asdict(self.hardware),
+                'system': asdict(self.system),
+                'algorithm': asdict(self.algorithm),
+                'location': asdict(self.location)
+            }
+        return copy.deepcopy(self._dict_cache)
     
     def update_hardware_config(self, **kwargs):
         """更新硬體配置"""
@@ -166,6 +189,7 @@ class ConfigManager:
             if hasattr(self.hardware, key):
                 setattr(self.hardware, key, value)
                 self.logger.info(f"更新硬體配置: {key} = {value}")
+        self._invalidate_cache()
     
     def update_system_config(self, **kwargs):
         """更新系統配置"""
@@ -173,6 +197,7 @@ class ConfigManager:
             if hasattr(self.system, key):
                 setattr(self.system, key, value)
                 self.logger.info(f"更新系統配置: {key} = {value}")
+        self._invalidate_cache()
     
     def update_algorithm_config(self, **kwargs):
         """更新演算法配置"""
@@ -180,6 +205,7 @@ class ConfigManager:
             if hasattr(self.algorithm, key):
                 setattr(self.algorithm, key, value)
                 self.logger.info(f"更新演算法配置: {key} = {value}")
+        self._invalidate_cache()
     
     def is_simulation_mode(self) -> bool:
         """檢查是否為模擬模式"""
@@ -206,16 +232,13 @@ class ConfigManager:
             }
         }
 
-# 全域配置管理器實例
-_config_manager = None
-
+# 全域配置管理器實例（第一次呼叫時建立並快取；需重建時呼叫 get_config_manager.cache_clear()）
+@lru_cache(maxsize=None)
 def get_config_manager() -> ConfigManager:
     """取得全域配置管理器實例"""
-    global _config_manager
-    if _config_manager is None:
-        _config_manager = ConfigManager()
-        _config_manager.load_config()
-    return _config_manager
+    config_manager = ConfigManager()
+    config_manager.load_config()
+    return config_manager
 
 # 便利函數
 def get_hardware_config() -> HardwareConfig: